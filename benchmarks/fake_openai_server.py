@@ -0,0 +1,169 @@
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from utils.custom_logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class FakeOpenAIServer:
+    """
+    A local server speaking the OpenAI chat completions protocol, answering with recorded responses.
+
+    The response is picked from the prompt text: item recognition, single part identification
+    or multi-part identification. Each request waits latency seconds (plus up to jitter) before
+    the first byte, like the time to first token of the real API. Streamed requests are answered
+    with server-sent events, one chunk every token_delay seconds.
+
+    The fixtures are a dictionary with:
+    - "prompt": the list of components returned for an item
+    - "which_part": the component names returned for dropped parts, used in turn
+    """
+
+    def __init__(self, fixtures: dict, latency: float = 0.8, jitter: float = 0.2, token_delay: float = 0.01,
+                 chunk_size: int = 8, host: str = "127.0.0.1", port: int = 0):
+        """
+        :param fixtures: The recorded responses.
+        :param latency: Time (in seconds) before the first byte of each response.
+        :param jitter: Maximum random time (in seconds) added to the latency.
+        :param token_delay: Time (in seconds) between two streamed chunks.
+        :param chunk_size: Number of characters per streamed chunk.
+        :param host: Address the server listens on.
+        :param port: Port the server listens on, 0 for any free port.
+        """
+        self.fixtures = fixtures
+        self.latency = latency
+        self.jitter = jitter
+        self.token_delay = token_delay
+        self.chunk_size = chunk_size
+        self.requests = 0
+        self._part_index = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> str:
+        """
+        Starts serving in a background thread and returns the base URL to give to the client.
+        """
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"Fake OpenAI server listening on {self.base_url}")
+        return self.base_url
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _next_part_names(self, count: int) -> list[str]:
+        names = self.fixtures["which_part"]
+        with self._lock:
+            start = self._part_index
+            self._part_index += count
+        return [names[(start + i) % len(names)] for i in range(count)]
+
+    def respond(self, request: dict) -> str:
+        """
+        Returns the content of the answer to a chat completion request.
+        """
+        with self._lock:
+            self.requests += 1
+        content = request["messages"][0]["content"]
+        prompt_text = "".join(part["text"] for part in content if part["type"] == "text")
+        image_count = sum(1 for part in content if part["type"] == "image_url")
+
+        if "each of which represents an item that was disposed of" in prompt_text:
+            return json.dumps(self._next_part_names(image_count))
+        if "represents an item that was disposed of" in prompt_text:
+            return self._next_part_names(1)[0]
+
+        components = self.fixtures["prompt"]
+        if request.get("response_format", {}).get("type") == "json_schema":
+            return json.dumps({"components": components})
+        return json.dumps(components)
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+            def do_POST(self):
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    self.send_error(404)
+                    return
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                request = json.loads(body)
+                content = server.respond(request)
+                time.sleep(server.latency + random.uniform(0, server.jitter))
+
+                if request.get("stream"):
+                    self._stream(request, content)
+                else:
+                    self._send_json(completion(request, content))
+
+            def _send_json(self, payload: dict):
+                data = json.dumps(payload).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _write_chunk(self, data: bytes):
+                self.wfile.write(f"{len(data):X}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+
+            def _stream(self, request: dict, content: str):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for i in range(0, len(content), server.chunk_size):
+                    chunk = completion_chunk(request, content[i:i + server.chunk_size])
+                    self._write_chunk(f"data: {json.dumps(chunk)}\n\n".encode())
+                    time.sleep(server.token_delay)
+                chunk = completion_chunk(request, None, finish_reason="stop")
+                self._write_chunk(f"data: {json.dumps(chunk)}\n\n".encode())
+                self._write_chunk(b"data: [DONE]\n\n")
+                self._write_chunk(b"")
+
+        return Handler
+
+
+def completion(request: dict, content: str) -> dict:
+    return {
+        "id": "chatcmpl-fake",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": request.get("model", "fake"),
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop",
+        }],
+        "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+    }
+
+
+def completion_chunk(request: dict, content: str, finish_reason: str = None) -> dict:
+    delta = {"role": "assistant", "content": content} if content is not None else {}
+    return {
+        "id": "chatcmpl-fake",
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": request.get("model", "fake"),
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+    }
@@ -0,0 +1,212 @@
+"""
+End-to-end latency benchmark of the recycling station.
+
+Runs the station state machine against a local fake OpenAI server and replayed camera
+frames, so the latency of each stage can be measured without the hardware or the network:
+
+    python -m benchmarks.latency_benchmark --items 20 --latency 0.8
+
+Recorded frames are read from a directory containing scan.jpg (the presented item) and
+a tracking/ directory of full resolution frames, replayed in name order. Without one,
+synthetic frames with parts dropped in each bin are generated.
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import Future
+
+import cv2
+import numpy as np
+
+from hardware.cameras.frame_buffer import Frame
+from material_recognition import create_classifier, PartBatcher, SpeculativeClassifier
+from object_tracking.motiondetection import MotionDetector
+from station import RecyclingStation, MASK, SCANNING
+from utils.latency import LatencyRecorder
+from .fake_openai_server import FakeOpenAIServer
+
+FRAME_SIZE = (2028, 1520)
+LORES_SIZE = (480, 360)
+FIXTURES_PATH = os.path.join(os.path.dirname(__file__), "fixtures", "responses.json")
+
+
+def make_frame(main: np.ndarray) -> Frame:
+    lores = cv2.cvtColor(cv2.resize(main, LORES_SIZE, interpolation=cv2.INTER_AREA), cv2.COLOR_BGR2GRAY)
+    return Frame(time.monotonic(), lores, main, 0.0)
+
+
+def synthetic_frames(drops: int, seed: int = 0):
+    """
+    Yields a static background, with a part dropped in each bin in turn.
+    """
+    rng = np.random.default_rng(seed)
+    background = rng.integers(40, 80, (FRAME_SIZE[1], FRAME_SIZE[0], 3), dtype=np.uint8)
+    for _ in range(10):
+        yield background
+    for drop in range(drops):
+        (x0, x1), (y0, y1) = MASK[drop % len(MASK)]
+        frame = background.copy()
+        frame[y0 + (y1 - y0) // 4:y1 - (y1 - y0) // 4, x0 + (x1 - x0) // 4:x1 - (x1 - x0) // 4] = 230
+        for _ in range(8):
+            yield frame
+        background = frame
+        for _ in range(10):
+            yield background
+
+
+def recorded_frames(directory: str):
+    tracking_directory = os.path.join(directory, "tracking")
+    for name in sorted(os.listdir(tracking_directory)):
+        image = cv2.imread(os.path.join(tracking_directory, name))
+        if image is not None:
+            yield image
+
+
+class ReplayTracker:
+    """
+    Stands in for ObjectTracker: presents the same item every scan, then replays the tracking frames.
+    """
+
+    def __init__(self, scan_image_path: str, frames, fps: float = 30, presence_delay: float = 0.3):
+        """
+        :param scan_image_path: Image of the presented item.
+        :param frames: Callable returning an iterator over the full resolution tracking frames.
+        :param fps: Rate at which the frames are replayed.
+        :param presence_delay: Time (in seconds) between the item being seen and it having settled.
+        """
+        self.scan_image_path = scan_image_path
+        self.frames = frames
+        self.frame_interval = 1 / fps
+        self.presence_delay = presence_delay
+        self.detected_at = None
+        self.exhausted = True
+        self._frames = iter(())
+        self._last_frame = None
+
+    def scan_for_new_object(self, on_presence=None):
+        self.detected_at = time.monotonic()
+        if on_presence is not None:
+            on_presence(make_frame(cv2.imread(self.scan_image_path)))
+        time.sleep(self.presence_delay)
+        self._frames = iter(self.frames())
+        self.exhausted = False
+        return self.scan_image_path
+
+    def capture_frame(self, timeout: float = 1.0) -> Frame:
+        time.sleep(self.frame_interval)
+        main = next(self._frames, None)
+        if main is None:
+            self.exhausted = True
+            return None
+        self._last_frame = make_frame(main)
+        return self._last_frame
+
+    def capture_settled_frame(self, timeout: float = 2.0) -> Frame:
+        return self._last_frame
+
+    def cleanup(self):
+        pass
+
+
+class NullFaceDisplay:
+    def display_neutral_face(self):
+        pass
+
+    def display_happy_face(self):
+        pass
+
+    def display_angry_face(self):
+        pass
+
+
+class RecordingSpeech:
+    """
+    Stands in for TextToSpeechManager, recording what would have been said.
+    """
+
+    def __init__(self):
+        self.sentences = []
+
+    def speak(self, text: str, priority=None) -> Future:
+        self.sentences.append(text)
+        future = Future()
+        future.set_result(True)
+        return future
+
+    def interrupt(self):
+        return 0
+
+
+def run_benchmark(args) -> LatencyRecorder:
+    with open(args.fixtures, "r") as fixtures_file:
+        fixtures = json.load(fixtures_file)
+    server = FakeOpenAIServer(fixtures, latency=args.latency, jitter=args.jitter, token_delay=args.token_delay)
+    base_url = server.start()
+
+    # The fake server ignores the key, but the client refuses to start without one
+    os.environ.setdefault("API_KEY", "benchmark")
+    client = create_classifier({
+        "BACKEND": "openai",
+        "OPENAI_BASE_URL": base_url,
+        "STRUCTURED_OUTPUT": not args.no_structured_output,
+        "CACHE_ENABLED": False,
+    })
+    speculative_client = SpeculativeClassifier(client) if args.speculative else None
+
+    with tempfile.TemporaryDirectory() as temp_directory:
+        if args.frames:
+            scan_image_path = os.path.join(args.frames, "scan.jpg")
+            frames = lambda: recorded_frames(args.frames)
+        else:
+            scan_image_path = os.path.join(temp_directory, "scan.jpg")
+            cv2.imwrite(scan_image_path, next(synthetic_frames(0, seed=1)))
+            frames = lambda: synthetic_frames(args.drops)
+
+        tracker = ReplayTracker(scan_image_path, frames, fps=args.fps)
+        latency = LatencyRecorder()
+        motion_detector = MotionDetector(MASK, scale=args.motion_scale, reference_size=FRAME_SIZE)
+        part_batcher = PartBatcher(client, window=args.batch_window)
+        station = RecyclingStation(tracker, client, NullFaceDisplay(), RecordingSpeech(), motion_detector,
+                                   part_batcher, speculative_client=speculative_client,
+                                   tracking_timeout=float("inf"), latency=latency)
+
+        for item in range(args.items):
+            station.step()
+            while station.state != SCANNING and not tracker.exhausted:
+                station.step()
+            # Let the last batch of parts be identified before scanning again
+            while len(part_batcher):
+                time.sleep(args.batch_window / 4)
+                station.track()
+            station.stop_tracking()
+            print(f"Item {item + 1}/{args.items} done")
+
+    server.stop()
+    print(f"Requests served: {server.requests}")
+    return latency
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=10, help="Number of items presented")
+    parser.add_argument("--drops", type=int, default=3, help="Parts dropped per item (synthetic frames)")
+    parser.add_argument("--frames", help="Directory of recorded frames")
+    parser.add_argument("--fixtures", default=FIXTURES_PATH, help="Recorded API responses")
+    parser.add_argument("--latency", type=float, default=0.8, help="Server time to first byte (s)")
+    parser.add_argument("--jitter", type=float, default=0.2, help="Random extra server latency (s)")
+    parser.add_argument("--token-delay", type=float, default=0.01, help="Delay between streamed chunks (s)")
+    parser.add_argument("--fps", type=float, default=30, help="Frame rate the tracking frames are replayed at")
+    parser.add_argument("--motion-scale", type=float, default=0.25, help="Motion analysis scale")
+    parser.add_argument("--batch-window", type=float, default=0.5, help="Part batching window (s)")
+    parser.add_argument("--speculative", action="store_true", help="Use speculative classification")
+    parser.add_argument("--no-structured-output", action="store_true", help="Do not request structured output")
+    args = parser.parse_args()
+
+    latency = run_benchmark(args)
+    print(latency.report())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from utils.custom_logger import get_logger
+
+# Initialize the logger
+logger = get_logger(__name__)
+
+# Number of custom characters the CGRAM of an HD44780 LCD holds
+CGRAM_SLOTS = 8
+
+# Placeholder of a custom glyph in a frame, e.g. "{eye_half}"
+GLYPH_PATTERN = re.compile(r"\{(\w+)\}")
+
+
+@dataclass
+class Animation:
+    """
+    A sequence of LCD screens.
+
+    Contains the following fields:
+    - name: the name of the animation
+    - frames: the screens to display, each a tuple with one string per row
+    - fps: the number of frames displayed per second
+    - loop: whether the animation starts over after its last frame
+    """
+
+    name: str
+    frames: list = field(default_factory=list)
+    fps: float = 4
+    loop: bool = False
+
+
+def allocate_glyphs(glyphs: dict) -> dict:
+    """
+    Assigns a CGRAM slot to each custom glyph.
+    :param glyphs: Bitmap of each glyph (8 rows of 5 bits), by name.
+    :return: The slot of each glyph, by name.
+    """
+    if len(glyphs) > CGRAM_SLOTS:
+        raise ValueError(f"The LCD holds {CGRAM_SLOTS} custom glyphs, {len(glyphs)} were defined.")
+    return {name: slot for slot, name in enumerate(glyphs)}
+
+
+def compile_screen(lcd, rows, slots: dict) -> tuple:
+    """
+    Turns the rows of a screen into the characters sent to the LCD.
+    :param lcd: The LCDDisplay the screen is displayed on.
+    :param rows: The text of each row, where "{name}" stands for the custom glyph of that name.
+    :param slots: The CGRAM slot of each glyph, by name.
+    :return: One string per row, as wide as the LCD.
+    """
+    def glyph(match):
+        name = match.group(1)
+        if name not in slots:
+            raise ValueError(f"Unknown glyph '{name}'.")
+        return chr(slots[name])
+
+    message = "\n".join(GLYPH_PATTERN.sub(glyph, row) for row in rows)
+    return tuple(lcd.format_message(message, wrap=False))
+
+
+class Animator:
+    """
+    Plays animations on an LCDDisplay from a background thread.
+
+    Frames are scheduled from the time the animation started, so a late frame does not
+    delay the next ones: the frames whose time has passed are skipped. A frame identical
+    to the one displayed is not sent, and the LCDDisplay only sends the cells that changed.
+    """
+
+    def __init__(self, lcd):
+        """
+        :param lcd: The LCDDisplay to play the animations on.
+        """
+        self.lcd = lcd
+        self.frames_displayed = 0
+        self.frames_skipped = 0
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def _play_worker(self, animation: Animation, stopped: threading.Event):
+        start = time.monotonic()
+        previous = None
+        index = 0
+        while not stopped.is_set():
+            frame = animation.frames[index % len(animation.frames)]
+            if frame != previous:
+                self.lcd.display_frame(frame)
+                self.frames_displayed += 1
+                previous = frame
+
+            # Move to the frame due now, skipping the ones that are already late
+            elapsed = time.monotonic() - start
+            next_index = max(index + 1, int(elapsed * animation.fps))
+            self.frames_skipped += next_index - index - 1
+            index = next_index
+            if not animation.loop and index >= len(animation.frames):
+                break
+            stopped.wait(max(start + index / animation.fps - time.monotonic(), 0))
+
+    def play(self, animation: Animation):
+        """
+        Stops the animation being played, and starts playing another one. Returns immediately.
+        """
+        self.stop()
+        if not animation.frames:
+            logger.warning(f"Animation '{animation.name}' has no frames.")
+            return
+
+        logger.debug(f"Playing animation '{animation.name}' at {animation.fps} fps")
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._play_worker, args=(animation, self._stopped), daemon=True)
+        self._thread.start()
+
+    def is_playing(self) -> bool:
+        """
+        Returns True while an animation is being played.
+        """
+        return self._thread is not None and self._thread.is_alive()
+
+    def stop(self):
+        """
+        Stops the animation being played, leaving its current frame displayed.
+        """
+        if self._thread is None:
+            return
+        self._stopped.set()
+        self._thread.join()
+        self._thread = None
@@ -1,4 +1,5 @@
-from hardware.displays.LCD_16x2_display import LCDDisplay
+from face_display.animation import Animation, Animator, allocate_glyphs, compile_screen
+from hardware.factory import create_lcd
 from utils.json_reader import read_json
 from utils.configuration import get_hardware_config
 from utils.custom_logger import get_logger
@@ -11,14 +12,23 @@ class FaceDisplay:
     def __init__(self):
         """
         Initialize the FaceDisplay object.
+
+        The LCD is opened once, and the expressions and animations are turned into LCD
+        screens once, so displaying a face only queues an already formatted screen.
         """
         self._hardware_config = get_hardware_config()
-        self._expressions = self._get_expressions()
         self._lcd = self._get_lcd()
+        self._faces = {
+            name: compile_screen(self._lcd, pattern[:self._lcd.rows], {})
+            for name, pattern in self._get_expressions().items()
+        }
+        self._animations = self._load_animations()
+        self._animator = Animator(self._lcd)
+        self._current_face = None
 
     def _get_expressions(self):
         """
-        Lazily load and return the face expressions.
+        Load and return the face expressions.
         """
         logger.debug("Loading face expressions...")
         expressions = read_json("face_display/expressions.json")
@@ -29,19 +39,37 @@ class FaceDisplay:
 
     def _get_lcd(self):
         """
-        Lazily initialize and return the LCD display.
+        Initialize and return the LCD display.
         """
         logger.debug("Initializing LCD display...")
         try:
-            I2C_LCD_ADDRESS = self._hardware_config.get(
-                "I2C_LCD_ADDRESS", 0x27)
-            lcd = LCDDisplay(address=I2C_LCD_ADDRESS)
-            logger.info(f"LCD initialized at address {hex(I2C_LCD_ADDRESS)}")
+            lcd = create_lcd(self._hardware_config)
         except Exception as e:
             logger.critical(f"Failed to initialize LCD: {e}")
             raise
         return lcd
 
+    def _load_animations(self):
+        """
+        Store the custom glyphs of the animations in the LCD, and return the animations by name.
+        """
+        logger.debug("Loading face animations...")
+        definitions = read_json("face_display/animations.json")
+        if definitions is None:
+            logger.critical("Failed to load face animations.")
+            raise RuntimeError("Face animations not available.")
+
+        glyphs = definitions.get("glyphs", {})
+        slots = allocate_glyphs(glyphs)
+        for name, slot in slots.items():
+            self._lcd.create_char(slot, glyphs[name])
+
+        return {
+            name: Animation(name, [compile_screen(self._lcd, frame, slots) for frame in animation["frames"]],
+                            fps=animation.get("fps", 4), loop=animation.get("loop", False))
+            for name, animation in definitions.get("animations", {}).items()
+        }
+
     def display_message(self, message: str, duration: int = 5):
         """
         Display a message on the LCD for a fixed duration.
@@ -62,22 +90,38 @@ class FaceDisplay:
         :param face_type: The type of face expression (e.g., "happy", "angry").
         """
         try:
-            expressions = self._get_expressions()
-            if face_type not in expressions:
+            if face_type not in self._faces:
                 logger.error(
                     f"Face type '{face_type}' not found in expressions.json.")
                 return
 
-            lcd = self._get_lcd()
-            face_pattern = expressions[face_type]
-            face_message = "\n".join(face_pattern[:2])
+            self._animator.stop()
             if duration:
-                lcd.display_timed_message(face_message, duration)
-            else:
-                lcd.display_message(face_message)
+                self._lcd.display_frame(self._faces[face_type], duration)
+            elif face_type != self._current_face:
+                self._lcd.display_frame(self._faces[face_type])
+                self._current_face = face_type
         except Exception as e:
             logger.critical(f"Unhandled exception while displaying face '{face_type}': {e}")
 
+    def play_animation(self, name: str):
+        """
+        Play an animation from animations.json on the LCD. Returns immediately.
+        :param name: The name of the animation (e.g., "blink", "thinking").
+        """
+        if name not in self._animations:
+            logger.error(f"Animation '{name}' not found in animations.json.")
+            return
+
+        self._current_face = None
+        self._animator.play(self._animations[name])
+
+    def stop_animation(self):
+        """
+        Stop the animation being played, leaving its current frame displayed.
+        """
+        self._animator.stop()
+
     def display_angry_face(self, duration=None):
         """
         Display the 'angry' face on the LCD.
@@ -96,18 +140,38 @@ class FaceDisplay:
         """
         self._display_face("neutral", duration)
 
+    def cleanup(self):
+        """
+        Stop the animation being played and the LCD worker.
+        """
+        self._animator.stop()
+        self._lcd.close()
+
 
 if __name__ == "__main__":
     # Example usage
+    import time
+
     face_display = FaceDisplay()
 
     try:
         # Display a custom message
-        face_display.display_message("Hello, World!")
+        face_display.display_message("Hello, World!", 2)
+        time.sleep(2)
 
         # Display predefined faces
         face_display.display_happy_face()
+        time.sleep(1)
         face_display.display_angry_face()
+        time.sleep(1)
         face_display.display_neutral_face()
+
+        # Play animations
+        face_display.play_animation("blink")
+        time.sleep(1)
+        face_display.play_animation("thinking")
+        time.sleep(3)
     except Exception as e:
         logger.critical(f"Unhandled exception in main: {e}")
+    finally:
+        face_display.cleanup()
@@ -0,0 +1,6 @@
+from .factory import create_camera, create_distance_sensor, create_lcd, create_speaker
+
+assert create_camera
+assert create_distance_sensor
+assert create_lcd
+assert create_speaker
@@ -0,0 +1,155 @@
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+
+import cv2
+import numpy as np
+
+from hardware.cameras.frame_buffer import Frame, FrameBuffer
+from utils.custom_logger import get_logger
+
+# Initialize the logger
+logger = get_logger(__name__)
+
+
+class Camera(ABC):
+    """
+    Base class of the cameras streaming into a frame buffer.
+
+    A background thread keeps the last frames of the low resolution grayscale "lores"
+    stream, used for tracking, in a ring buffer. Frames of the full resolution "main"
+    stream, used for the images sent to classification, are several megabytes each, so
+    they are only captured on demand with capture_main_frame. Subclasses implement
+    _read_lores and _read_main.
+    """
+
+    name = "Camera"
+
+    def __init__(self, image_path="captured_images/", main_size=(2028, 1520), lores_size=(480, 360)):
+        """
+        :param image_path: Directory where images will be saved.
+        :param main_size: (width, height) of the full resolution stream.
+        :param lores_size: (width, height) of the low resolution stream.
+        """
+        self.image_path = image_path
+        os.makedirs(image_path, exist_ok=True)  # Ensure directory exists
+        self.main_size = main_size
+        self.lores_size = lores_size
+        self.frame_buffer = None
+        self._streaming = threading.Event()
+        self._capture_thread = None
+
+    @abstractmethod
+    def _read_lores(self) -> np.ndarray:
+        """
+        Captures the next frame of the lores stream. Called continuously by the capture thread.
+        :return: The grayscale lores frame.
+        """
+
+    @abstractmethod
+    def _read_main(self) -> np.ndarray:
+        """
+        Captures the current frame of the main stream.
+        :return: The BGR main frame.
+        """
+
+    def save_frame(self, frame: np.ndarray, filename="object.jpg"):
+        """
+        Save a frame that was already captured, e.g. one taken from the frame buffer.
+        :param frame: The BGR frame to save.
+        :param filename: Name of the image file.
+        :return: Full path to the saved image.
+        """
+        try:
+            filepath = os.path.join(self.image_path, filename)
+            cv2.imwrite(filepath, frame)
+            logger.info(f"Image saved at: {filepath}")
+            return filepath
+        except Exception as e:
+            logger.error(f"Error saving image: {e}")
+            return None
+
+    def start_streaming(self, buffer_size: int = 8):
+        """
+        Start a background thread that keeps the last frames of the lores stream in a ring buffer.
+        :param buffer_size: Number of frames kept in the buffer.
+        """
+        if self._streaming.is_set():
+            return
+        self.frame_buffer = FrameBuffer(buffer_size)
+        self._streaming.set()
+        self._capture_thread = threading.Thread(target=self._capture_worker, daemon=True)
+        self._capture_thread.start()
+        logger.info(f"{self.name} streaming into a {buffer_size} frame buffer")
+
+    def stop_streaming(self):
+        """
+        Stop the background capture thread.
+        """
+        if not self._streaming.is_set():
+            return
+        self._streaming.clear()
+        self._capture_thread.join()
+        self._capture_thread = None
+
+    def _capture_worker(self):
+        """
+        Continuously captures frames from the lores stream into the frame buffer.
+        """
+        while self._streaming.is_set():
+            try:
+                lores = self._read_lores()
+                sharpness = float(cv2.Laplacian(lores, cv2.CV_32F).var())
+                self.frame_buffer.append(Frame(time.monotonic(), lores, sharpness=sharpness))
+            except Exception as e:
+                logger.error(f"Error capturing frame into buffer: {e}")
+                time.sleep(0.1)
+
+    def capture_main_frame(self) -> Frame:
+        """
+        Captures a full resolution frame, paired with the newest buffered lores frame.
+        :return: A Frame whose main image is set, or None if the capture failed.
+        """
+        try:
+            main = self._read_main()
+        except Exception as e:
+            logger.error(f"Error capturing main frame: {e}")
+            return None
+        if main is None:
+            return None
+        latest = self.latest_frame() if self.frame_buffer is not None else None
+        if latest is None:
+            return Frame(time.monotonic(), None, main)
+        return Frame(time.monotonic(), latest.lores, main, latest.sharpness)
+
+    def latest_frame(self) -> Frame:
+        """
+        Returns the newest buffered frame without waiting for the sensor.
+        """
+        return self.frame_buffer.latest()
+
+    def frame_nearest(self, timestamp: float) -> Frame:
+        """
+        Returns the buffered frame captured closest to the given time.monotonic() timestamp.
+        """
+        return self.frame_buffer.nearest(timestamp)
+
+    def sharpest_frame(self, count: int = 5) -> Frame:
+        """
+        Returns the sharpest of the last `count` buffered frames.
+        """
+        return self.frame_buffer.sharpest(count)
+
+    def wait_for_frame(self, after: float = None, timeout: float = 1.0) -> Frame:
+        """
+        Waits for a buffered frame newer than `after` and returns it, or None on timeout.
+        """
+        return self.frame_buffer.wait_for_frame(after, timeout)
+
+    def cleanup(self):
+        """
+        Stop the background capture thread if it is running.
+        """
+        self.stop_streaming()
+        logger.info(f"{self.name} cleanup complete.")
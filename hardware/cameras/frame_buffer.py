@@ -0,0 +1,89 @@
+import threading
+from collections import deque
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass
+class Frame:
+    """
+    A frame captured by the camera's background thread.
+
+    Contains the following fields:
+    - timestamp: time.monotonic() value at capture
+    - lores: grayscale low resolution image used for tracking
+    - main: full resolution BGR image used for classification, only captured on demand (None in the buffer)
+    - sharpness: variance of the Laplacian of the lores image, higher is sharper
+    """
+
+    timestamp: float
+    lores: np.ndarray
+    main: np.ndarray = None
+    sharpness: float = 0.0
+
+
+class FrameBuffer:
+    """
+    Thread-safe ring buffer holding the last N lores frames captured by the camera.
+    """
+
+    def __init__(self, size: int = 8):
+        """
+        :param size: Maximum number of frames kept. The oldest frame is dropped when full.
+        """
+        self._frames = deque(maxlen=size)
+        self._condition = threading.Condition()
+
+    def append(self, frame: Frame):
+        """
+        Adds a frame and wakes up the consumers waiting for a new frame.
+        """
+        with self._condition:
+            self._frames.append(frame)
+            self._condition.notify_all()
+
+    def clear(self):
+        with self._condition:
+            self._frames.clear()
+
+    def latest(self) -> Frame:
+        """
+        Returns the newest frame, or None if the buffer is empty.
+        """
+        with self._condition:
+            return self._frames[-1] if self._frames else None
+
+    def nearest(self, timestamp: float) -> Frame:
+        """
+        Returns the frame captured closest to the given time.monotonic() timestamp, or None if the buffer is empty.
+        """
+        with self._condition:
+            if not self._frames:
+                return None
+            return min(self._frames, key=lambda frame: abs(frame.timestamp - timestamp))
+
+    def sharpest(self, count: int) -> Frame:
+        """
+        Returns the sharpest of the last `count` frames, or None if the buffer is empty.
+        """
+        with self._condition:
+            if not self._frames:
+                return None
+            recent = list(self._frames)[-count:]
+            return max(recent, key=lambda frame: frame.sharpness)
+
+    def wait_for_frame(self, after: float = None, timeout: float = None) -> Frame:
+        """
+        Blocks until a frame newer than `after` is available and returns the newest frame.
+        :param after: Timestamp the returned frame must be newer than. Any frame will do when None.
+        :param timeout: Maximum time (in seconds) to wait.
+        :return: The newest frame, or None if the timeout expired.
+        """
+        def is_ready():
+            return self._frames and (after is None or self._frames[-1].timestamp > after)
+
+        with self._condition:
+            if not self._condition.wait_for(is_ready, timeout):
+                return None
+            return self._frames[-1]
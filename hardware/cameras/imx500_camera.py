@@ -1,29 +1,38 @@
 import os
 import subprocess
 from utils.custom_logger import get_logger
-import time
 
+import numpy as np
 from PIL import Image
 from picamera2 import Picamera2
 
+from hardware.cameras.camera import Camera
+
 # Initialize the logger
 logger = get_logger(__name__)
 
 
-class IMX500Camera:
-    def __init__(self, image_path="captured_images/"):
+class IMX500Camera(Camera):
+    name = "IMX500 Camera"
+
+    def __init__(self, image_path="captured_images/", main_size=(2028, 1520), lores_size=(480, 360)):
         """
         Initialize the IMX500 AI Camera.
+
+        The camera runs continuously with two streams: a full resolution "main" stream
+        used for the images sent to classification, and a low resolution "lores" stream
+        used for tracking and presence detection.
         :param image_path: Directory where images will be saved.
+        :param main_size: (width, height) of the full resolution stream.
+        :param lores_size: (width, height) of the low resolution stream.
         """
+        super().__init__(image_path, main_size, lores_size)
         try:
-            self.image_path = image_path
-            os.makedirs(image_path, exist_ok=True)  # Ensure directory exists
-
             # create fast camera and configure
             self.picam2 = Picamera2()
-            self.picam2.configure(self.picam2.create_still_configuration(
-                main={"format": 'RGB888', "size": (2028, 1520)}))
+            self.picam2.configure(self.picam2.create_preview_configuration(
+                main={"format": 'RGB888', "size": main_size},
+                lores={"format": 'YUV420', "size": lores_size}))
             self.picam2.start()
 
             # Check if libcamera is available
@@ -58,11 +67,51 @@ class IMX500Camera:
         
         return self.picam2.capture_image()
 
-    def cleanup(self):
+    def capture_lores(self) -> np.ndarray:
+        """
+        Captures a frame from the low resolution stream for tracking.
+        Only the luminance plane of the YUV420 buffer is kept, which is already a grayscale image.
+        :return: The grayscale frame, or None if the capture failed.
+        """
+        frame = self.capture_array("lores")
+        if frame is None:
+            return None
+        width, height = self.lores_size
+        return frame[:height, :width]
+
+    def capture_still(self) -> np.ndarray:
+        """
+        Captures a full resolution frame from the main stream for classification.
+        :return: The BGR frame, or None if the capture failed.
+        """
+        return self.capture_array("main")
+
+    def capture_array(self, stream: str = "main") -> np.ndarray:
+        """
+        Captures a frame and returns it as a NumPy array without encoding it or writing it to disk.
+        With the RGB888 format the array is laid out as BGR, which is what OpenCV expects.
+        :param stream: Name of the Picamera2 stream to capture from.
+        :return: The captured frame, or None if the capture failed.
+        """
+        try:
+            return self.picam2.capture_array(stream)
+        except Exception as e:
+            logger.error(f"Error capturing frame: {e}")
+            return None
+
+    def _read_lores(self) -> np.ndarray:
+        """
+        Captures the luminance plane of the lores stream, without touching the main stream.
+        """
+        frame = self.picam2.capture_array("lores")
+        width, height = self.lores_size
+        return frame[:height, :width]
+
+    def _read_main(self) -> np.ndarray:
         """
-        Placeholder for any cleanup operations if needed.
+        Captures a full resolution frame of the main stream.
         """
-        logger.info("IMX500 Camera cleanup complete.")
+        return self.picam2.capture_array("main")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,149 @@
+import os
+import threading
+import time
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from hardware.cameras.camera import Camera
+from utils.custom_logger import get_logger
+
+# Initialize the logger
+logger = get_logger(__name__)
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+class SimulatedCamera(Camera):
+    """
+    Camera replaying recorded frames, to run the station without the IMX500.
+
+    Frames are read from a directory of images, replayed in name order, or from a video
+    file, at the given frame rate. Every frame is resized to the main stream size, and the
+    lores stream is derived from it. Without a source, a uniform gray frame is produced.
+    """
+
+    name = "Simulated Camera"
+
+    def __init__(self, source: str = None, image_path="captured_images/", main_size=(2028, 1520),
+                 lores_size=(480, 360), fps: float = 30, loop: bool = True):
+        """
+        :param source: Directory of images or video file to replay.
+        :param image_path: Directory where images will be saved.
+        :param main_size: (width, height) of the full resolution stream.
+        :param lores_size: (width, height) of the low resolution stream.
+        :param fps: Rate at which the frames are produced.
+        :param loop: Whether to start over at the end of the source, otherwise the last frame is repeated.
+        """
+        super().__init__(image_path, main_size, lores_size)
+        self.source = source
+        self.frame_interval = 1 / fps
+        self.loop = loop
+        self._lock = threading.Lock()
+        self._next_frame_time = None
+        self._last_main = None
+        self._images = None
+        self._image_index = 0
+        self._video = None
+
+        if source is None:
+            self._last_main = np.full((main_size[1], main_size[0], 3), 128, dtype=np.uint8)
+        elif os.path.isdir(source):
+            self._images = sorted(os.path.join(source, name) for name in os.listdir(source)
+                                  if name.lower().endswith(IMAGE_EXTENSIONS))
+            if not self._images:
+                raise FileNotFoundError(f"No images found in {source}")
+        else:
+            self._video = cv2.VideoCapture(source)
+            if not self._video.isOpened():
+                raise FileNotFoundError(f"Could not open video: {source}")
+        logger.info(f"Simulated Camera initialized from {source or 'a blank frame'}")
+
+    def _read_source(self) -> np.ndarray:
+        """
+        Returns the next frame of the source, or None once it is exhausted.
+        """
+        if self._images is not None:
+            if self._image_index >= len(self._images):
+                if not self.loop:
+                    return None
+                self._image_index = 0
+            image = cv2.imread(self._images[self._image_index])
+            self._image_index += 1
+            return image
+
+        if self._video is not None:
+            success, image = self._video.read()
+            if not success and self.loop:
+                self._video.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                success, image = self._video.read()
+            return image if success else None
+        return None
+
+    def _next_main(self) -> np.ndarray:
+        with self._lock:
+            image = self._read_source()
+            if image is not None:
+                if (image.shape[1], image.shape[0]) != self.main_size:
+                    image = cv2.resize(image, self.main_size, interpolation=cv2.INTER_AREA)
+                self._last_main = image
+            return self._last_main
+
+    def _to_lores(self, main: np.ndarray) -> np.ndarray:
+        lores = cv2.resize(main, self.lores_size, interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(lores, cv2.COLOR_BGR2GRAY)
+
+    def _read_lores(self) -> np.ndarray:
+        """
+        Waits for the next frame period, like a sensor would, and returns the next frame of the lores stream.
+        """
+        now = time.monotonic()
+        if self._next_frame_time is None or self._next_frame_time < now:
+            self._next_frame_time = now
+        time.sleep(self._next_frame_time - now)
+        self._next_frame_time += self.frame_interval
+
+        return self._to_lores(self._next_main())
+
+    def _read_main(self) -> np.ndarray:
+        """
+        Returns the full resolution version of the frame currently streamed.
+        """
+        with self._lock:
+            main = self._last_main
+        return main if main is not None else self._next_main()
+
+    def capture_image(self, filename="object.jpg"):
+        """
+        Saves the next frame.
+        :param filename: Name of the image file.
+        :return: Full path to the saved image.
+        """
+        return self.save_frame(self._next_main(), filename)
+
+    def capture_image_no_file(self) -> Image.Image:
+        """
+        Returns the next frame as a PIL.Image.Image object.
+        """
+        return Image.fromarray(cv2.cvtColor(self._next_main(), cv2.COLOR_BGR2RGB))
+
+    def capture_lores(self) -> np.ndarray:
+        """
+        Returns the next frame of the low resolution stream.
+        """
+        return self._to_lores(self._next_main())
+
+    def capture_still(self) -> np.ndarray:
+        """
+        Returns the next full resolution frame.
+        """
+        return self._next_main()
+
+    def capture_array(self, stream: str = "main") -> np.ndarray:
+        return self.capture_lores() if stream == "lores" else self.capture_still()
+
+    def cleanup(self):
+        super().cleanup()
+        if self._video is not None:
+            self._video.release()
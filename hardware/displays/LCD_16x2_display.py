@@ -1,32 +1,154 @@
-from time import sleep
-from RPLCD.i2c import CharLCD
+import queue
+import threading
+import time
 from utils.custom_logger import get_logger
 
 # Initialize the logger
 logger = get_logger(__name__)
 
+# Unchanged cells between two changed ones are rewritten rather than moving the cursor,
+# when the gap is at most this long: a cursor move costs about as much I2C traffic as a character.
+MAX_GAP = 1
+
 
 class LCDDisplay:
-    def __init__(self, address=0x27, bus_type='PCF8574', columns=16, rows=2):
+    """
+    Character LCD driven by a background worker thread.
+
+    display_message, display_timed_message and clear only queue a command and return
+    immediately. The worker keeps a shadow framebuffer of what the LCD shows, and only
+    sends the cells that changed. When several commands are queued, only the resulting
+    screen is sent. A timed message is replaced by the content shown before it once its
+    duration expires.
+    """
+
+    def __init__(self, address=0x27, bus_type='PCF8574', columns=16, rows=2, lcd=None):
         """
         Initialize the LCD display.
         :param address: I2C address of the LCD.
         :param bus_type: Type of I2C driver (default is 'PCF8574').
         :param columns: Number of columns on the LCD (default is 16).
         :param rows: Number of rows on the LCD (default is 2).
+        :param lcd: Character LCD driver to use instead of the I2C one, e.g. a MemoryCharLCD.
         """
+        self.columns = columns
+        self.rows = rows
+        self._shadow = [" " * columns] * rows
+        self._commands = queue.Queue()
+        self._worker = None
         try:
-            self.lcd = CharLCD(bus_type, address, cols=columns, rows=rows)
-            self.columns = columns
-            self.rows = rows
-            logger.info(f"LCD initialized at address {hex(address)}")
+            if lcd is None:
+                # Imported here so the display can be simulated without RPLCD installed
+                from RPLCD.i2c import CharLCD
+                lcd = CharLCD(bus_type, address, cols=columns, rows=rows)
+                logger.info(f"LCD initialized at address {hex(address)}")
+            self.lcd = lcd
+            # Start from a known blank screen, so the shadow framebuffer matches the LCD
+            self.lcd.clear()
         except Exception as e:
             logger.error(f"Failed to initialize LCD: {e}")
             self.lcd = None
+            return
+
+        self._worker = threading.Thread(target=self._display_worker, daemon=True)
+        self._worker.start()
+
+    def format_message(self, message, wrap=True):
+        """
+        Split a message into the rows of the LCD, each padded to its width.
+        :param message: Text to format. Use \n for manual line breaks.
+        :param wrap: Whether to wrap long lines to fit the display (default is True).
+        :return: A list with one string per row, which can be passed to display_frame.
+        """
+        formatted_lines = []
+        for line in message.split("\n"):
+            while line:
+                formatted_lines.append(line[:self.columns].ljust(self.columns))
+                line = line[self.columns:] if wrap else ""
+
+        # Truncate to the LCD height
+        formatted_lines = formatted_lines[:self.rows]
+        return formatted_lines + [" " * self.columns] * (self.rows - len(formatted_lines))
+
+    def _changed_runs(self, row, old, new):
+        """
+        Yield (start, text) for each run of cells that differ between two versions of a row.
+        """
+        start = end = None
+        for col in range(self.columns):
+            if old[col] == new[col]:
+                continue
+            if start is not None and col - end > MAX_GAP:
+                yield start, new[start:end]
+                start = None
+            if start is None:
+                start = col
+            end = col + 1
+        if start is not None:
+            yield start, new[start:end]
+
+    def _render(self, screen):
+        """
+        Send the cells of the screen that differ from the shadow framebuffer. Runs on the worker thread.
+        """
+        for row in range(self.rows):
+            for start, text in self._changed_runs(row, self._shadow[row], screen[row]):
+                self.lcd.cursor_pos = (row, start)
+                self.lcd.write_string(text)
+            self._shadow[row] = screen[row]
+
+    def _display_worker(self):
+        """
+        Apply the queued commands to the screen, and restore the screen under timed messages when they expire.
+        """
+        # Content shown when no timed message is active. A copy, as _render updates the shadow in place
+        base_screen = list(self._shadow)
+        timed_screen, expires_at = None, None
+
+        while True:
+            timeout = None if expires_at is None else max(expires_at - time.monotonic(), 0)
+            try:
+                commands = [self._commands.get(timeout=timeout)]
+            except queue.Empty:
+                commands = []
+            # Only the screen resulting from all the queued commands is sent
+            while True:
+                try:
+                    commands.append(self._commands.get_nowait())
+                except queue.Empty:
+                    break
+
+            running = True
+            for command, screen, duration in commands:
+                if command == "glyph":
+                    try:
+                        self.lcd.create_char(*screen)
+                    except Exception as e:
+                        logger.error(f"Error creating custom character: {e}")
+                elif command == "show":
+                    if duration:
+                        timed_screen, expires_at = screen, time.monotonic() + duration
+                    else:
+                        base_screen, timed_screen, expires_at = screen, None, None
+                elif command == "stop":
+                    running = False
+
+            if expires_at is not None and time.monotonic() >= expires_at:
+                timed_screen, expires_at = None, None
+
+            try:
+                self._render(timed_screen or base_screen)
+            except Exception as e:
+                logger.error(f"Error displaying message: {e}")
+            finally:
+                for _ in commands:
+                    self._commands.task_done()
+            if not running:
+                break
 
     def display_message(self, message, wrap=True):
         """
-        Display a message on the LCD, formatted for a 16x2 screen.
+        Display a message on the LCD, formatted for a 16x2 screen. Returns immediately.
         :param message: Text to display. Use \n for manual line breaks.
         :param wrap: Whether to wrap long lines to fit the display (default is True).
         """
@@ -34,41 +156,24 @@ class LCDDisplay:
             logger.error("LCD not initialized. Cannot display message.")
             return
 
-        try:
-            # Split the message into lines
-            lines = message.split("\n")
-            formatted_lines = []
-
-            for line in lines:
-                while line:
-                    formatted_lines.append(
-                        line[:self.columns].ljust(self.columns))
-                    line = line[self.columns:] if wrap else ""
-
-            # Combine formatted lines and truncate to the LCD height
-            formatted_message = "".join(formatted_lines[:self.rows])
-            logger.debug(f"Displaying formatted message:\n{formatted_message}")
-            self.lcd.write_string(formatted_message)
-        except Exception as e:
-            logger.error(f"Error displaying message: {e}")
+        screen = self.format_message(message, wrap)
+        logger.debug("Displaying formatted message:\n" + "\n".join(screen))
+        self._commands.put(("show", screen, None))
 
     def clear(self):
         """
-        Clear the LCD screen.
+        Clear the LCD screen. Returns immediately.
         """
         if self.lcd is None:
             logger.error("LCD not initialized. Cannot clear.")
             return
 
-        try:
-            logger.info("Clearing LCD screen")
-            self.lcd.clear()
-        except Exception as e:
-            logger.error(f"Error clearing LCD screen: {e}")
+        logger.info("Clearing LCD screen")
+        self._commands.put(("show", [" " * self.columns] * self.rows, None))
 
     def display_timed_message(self, message, duration=5):
         """
-        Display a message on the LCD for a specific duration, then clear it.
+        Display a message on the LCD for a specific duration, then show what was displayed before. Returns immediately.
         :param message: Text to display on the LCD.
         :param duration: Time (in seconds) to display the message (default is 5).
         """
@@ -76,13 +181,48 @@ class LCDDisplay:
             logger.error("LCD not initialized. Cannot display timed message.")
             return
 
-        try:
-            self.display_message(message)
-            sleep(duration)
-        except Exception as e:
-            logger.error(f"Error displaying timed message: {e}")
-        finally:
-            self.clear()
+        self._commands.put(("show", self.format_message(message), duration))
+
+    def display_frame(self, screen, duration=None):
+        """
+        Display a screen formatted by format_message. Returns immediately.
+        :param screen: One string per row, each as wide as the LCD.
+        :param duration: Time (in seconds) to display the screen, or None to keep it displayed.
+        """
+        if self.lcd is None:
+            logger.error("LCD not initialized. Cannot display frame.")
+            return
+
+        self._commands.put(("show", list(screen), duration))
+
+    def create_char(self, location, bitmap):
+        """
+        Store a custom character in the CGRAM of the LCD, displayed by writing chr(location). Returns immediately.
+        :param location: CGRAM slot, between 0 and 7.
+        :param bitmap: 8 rows of 5 bits.
+        """
+        if self.lcd is None:
+            logger.error("LCD not initialized. Cannot create custom character.")
+            return
+
+        self._commands.put(("glyph", (location, tuple(bitmap)), None))
+
+    def wait(self):
+        """
+        Block until every queued command has been sent to the LCD.
+        """
+        if self._worker is not None:
+            self._commands.join()
+
+    def close(self):
+        """
+        Stop the worker thread once the queued commands have been sent.
+        """
+        if self._worker is None:
+            return
+        self._commands.put(("stop", None, None))
+        self._worker.join()
+        self._worker = None
 
 
 if __name__ == "__main__":
@@ -91,7 +231,11 @@ if __name__ == "__main__":
 
     try:
         lcd.display_timed_message("I2C Address 0x27\nHello, World!", 5)
+        time.sleep(5)
         lcd.display_timed_message(
             "This is a long message that exceeds the capacity\nof a 16x2 display!", 5)
+        time.sleep(5)
     except Exception as e:
         logger.critical(f"Unhandled exception: {e}")
+    finally:
+        lcd.close()
@@ -0,0 +1,101 @@
+import time
+from collections import deque
+from utils.custom_logger import get_logger
+
+# Initialize the logger
+logger = get_logger(__name__)
+
+
+class MemoryCharLCD:
+    """
+    In-memory character LCD with the same interface as RPLCD's CharLCD, to run the display without the hardware.
+
+    Characters are written to a framebuffer at the cursor position, with the same automatic
+    line breaks as RPLCD: the cursor moves to the next row at the end of a row, and back to
+    the first row after the last one. A snapshot of the framebuffer is kept after each
+    write, and the number of characters and commands sent is counted, as a proxy for the
+    I2C traffic of the real display.
+    """
+
+    def __init__(self, cols=16, rows=2, history_size=256):
+        """
+        :param cols: Number of columns of the LCD.
+        :param rows: Number of rows of the LCD.
+        :param history_size: Number of framebuffer snapshots kept.
+        """
+        self.cols = cols
+        self.rows = rows
+        self.framebuffer = [[" "] * cols for _ in range(rows)]
+        self.custom_chars = {}
+        self.history = deque(maxlen=history_size)
+        self.characters_written = 0
+        self.commands_sent = 0
+        self._row = 0
+        self._col = 0
+
+    @property
+    def cursor_pos(self):
+        return self._row, self._col
+
+    @cursor_pos.setter
+    def cursor_pos(self, value):
+        self._row, self._col = value
+        self.commands_sent += 1
+
+    def _snapshot(self):
+        self.history.append((time.monotonic(), self.lines()))
+
+    def lines(self):
+        """
+        Returns the content of each row.
+        """
+        return ["".join(row) for row in self.framebuffer]
+
+    def write_string(self, value):
+        """
+        Writes the string at the cursor position. \\r moves to the start of the row, \\n to the next row.
+        """
+        for char in value:
+            if char == "\r":
+                self._col = 0
+                continue
+            if char == "\n":
+                self._row = (self._row + 1) % self.rows
+                continue
+
+            self.framebuffer[self._row][self._col] = char
+            self.characters_written += 1
+            self._col += 1
+            if self._col >= self.cols:
+                self._col = 0
+                self._row = (self._row + 1) % self.rows
+        self._snapshot()
+
+    def clear(self):
+        self.framebuffer = [[" "] * self.cols for _ in range(self.rows)]
+        self._row, self._col = 0, 0
+        self.commands_sent += 1
+        self._snapshot()
+
+    def home(self):
+        self._row, self._col = 0, 0
+        self.commands_sent += 1
+
+    def create_char(self, location, bitmap):
+        """
+        Stores a custom character, written with chr(location).
+        :param location: CGRAM slot, between 0 and 7.
+        :param bitmap: 8 rows of 5 bits.
+        """
+        if not 0 <= location <= 7:
+            raise ValueError("Custom characters are stored in locations 0 to 7.")
+        self.custom_chars[location] = tuple(bitmap)
+        self.commands_sent += 1
+
+    def close(self, clear=False):
+        if clear:
+            self.clear()
+        logger.debug("Memory LCD closed.")
+
+    def __str__(self):
+        return "\n".join(self.lines())
@@ -0,0 +1,85 @@
+from utils.configuration import get_hardware_config
+
+# The drivers are imported in the functions below, so that only the dependencies of the
+# selected backend (picamera2, lgpio, RPLCD, pygame) need to be installed.
+RASPBERRY_PI = "raspberry_pi"
+SIMULATED = "simulated"
+
+
+def _backend(config: dict) -> str:
+    backend = config.get("BACKEND", RASPBERRY_PI)
+    if backend not in (RASPBERRY_PI, SIMULATED):
+        raise ValueError(f"Unknown hardware backend: {backend}")
+    return backend
+
+
+def create_camera(config: dict = None):
+    """
+    Creates the camera of the hardware backend selected by the "BACKEND" key of the configuration.
+    :param config: The hardware configuration. Loaded from hardware_config.json when None.
+    :return: An IMX500Camera, or a SimulatedCamera replaying "SIMULATED_CAMERA_SOURCE".
+    """
+    if config is None:
+        config = get_hardware_config()
+
+    if _backend(config) == SIMULATED:
+        from hardware.cameras.simulated_camera import SimulatedCamera
+        return SimulatedCamera(source=config.get("SIMULATED_CAMERA_SOURCE"),
+                               fps=config.get("SIMULATED_CAMERA_FPS", 30))
+
+    from hardware.cameras.imx500_camera import IMX500Camera
+    return IMX500Camera()
+
+
+def create_distance_sensor(trigger_distance=15, callback=None, config: dict = None):
+    """
+    Creates the distance sensor of the selected hardware backend.
+    :param trigger_distance: Distance (in cm) at which to trigger a response.
+    :param callback: Function to call when an object is detected.
+    :param config: The hardware configuration. Loaded from hardware_config.json when None.
+    :return: An UltrasonicSensor, or a SimulatedUltrasonicSensor replaying "SIMULATED_DISTANCE_TRACE".
+    """
+    if config is None:
+        config = get_hardware_config()
+
+    if _backend(config) == SIMULATED:
+        from hardware.motion_sensor.simulated_sensor import SimulatedUltrasonicSensor
+        return SimulatedUltrasonicSensor(trace=config.get("SIMULATED_DISTANCE_TRACE"),
+                                         trigger_distance=trigger_distance, callback=callback)
+
+    from hardware.motion_sensor.ultrasonic_motion_sensor import UltrasonicSensor
+    return UltrasonicSensor(trigger_distance=trigger_distance, callback=callback)
+
+
+def create_lcd(config: dict = None):
+    """
+    Creates the LCD display of the selected hardware backend.
+    :param config: The hardware configuration. Loaded from hardware_config.json when None.
+    :return: An LCDDisplay driving the I2C LCD, or an in-memory MemoryCharLCD.
+    """
+    if config is None:
+        config = get_hardware_config()
+
+    from hardware.displays.LCD_16x2_display import LCDDisplay
+    if _backend(config) == SIMULATED:
+        from hardware.displays.memory_lcd import MemoryCharLCD
+        return LCDDisplay(lcd=MemoryCharLCD())
+
+    return LCDDisplay(address=config.get("I2C_LCD_ADDRESS", 0x27))
+
+
+def create_speaker(config: dict = None):
+    """
+    Creates the speaker of the selected hardware backend.
+    :param config: The hardware configuration. Loaded from hardware_config.json when None.
+    :return: A Speaker, or a NullSpeaker recording what would have been played.
+    """
+    if config is None:
+        config = get_hardware_config()
+
+    if _backend(config) == SIMULATED:
+        from hardware.speakers.null_speaker import NullSpeaker
+        return NullSpeaker(realtime=config.get("SIMULATED_REALTIME_AUDIO", True))
+
+    from hardware.speakers.USB_speaker import Speaker
+    return Speaker(cache_size=config.get("SPEAKER_CACHE_SIZE", 32))
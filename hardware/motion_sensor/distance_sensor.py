@@ -0,0 +1,63 @@
+import time
+from abc import ABC, abstractmethod
+from utils.custom_logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class DistanceSensor(ABC):
+    """
+    Base class of the distance sensors used to detect an item being presented.
+    Subclasses implement get_distance, read and cleanup.
+    """
+
+    def __init__(self, trigger_distance=15, callback=None):
+        """
+        :param trigger_distance: Distance (in cm) at which to trigger a response.
+        :param callback: Function to call when an object is detected.
+        """
+        self.trigger_distance = trigger_distance
+        self.callback = callback
+
+    @abstractmethod
+    def get_distance(self):
+        """
+        Measures the distance to the nearest object.
+        :return: Distance in cm, or None if the measurement failed.
+        """
+
+    @abstractmethod
+    def read(self):
+        """
+        Returns the last distance measured, without waiting.
+        :return: Distance in cm, or None if nothing was measured yet.
+        """
+
+    def start_monitoring(self, check_interval=0.5):
+        """
+        Continuously monitors distance and triggers the callback when an object is detected.
+        :param check_interval: Time (in seconds) between distance checks.
+        """
+        logger.info(f"Starting distance sensor monitoring... " +
+                    f"(Trigger distance: {self.trigger_distance} cm)")
+
+        try:
+            while True:
+                distance = self.get_distance()
+                logger.debug(f"Measured distance: {distance} cm")
+
+                if distance is not None and distance < self.trigger_distance:
+                    logger.info(f"Object detected within {self.trigger_distance} cm!")
+
+                    if self.callback:  # Call the user-defined function
+                        if self.callback(distance):
+                            return
+
+                time.sleep(check_interval)  # Wait before next measurement
+        except KeyboardInterrupt:
+            logger.info("Distance sensor monitoring stopped.")
+
+    def cleanup(self):
+        """
+        Releases the resources used by the sensor.
+        """
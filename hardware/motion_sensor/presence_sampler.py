@@ -0,0 +1,153 @@
+import statistics
+import threading
+from collections import deque
+from enum import Enum
+from hardware.motion_sensor.distance_sensor import DistanceSensor
+from utils.custom_logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class PresenceEvent(Enum):
+    ENTERED = "entered"
+    LEFT = "left"
+
+
+class PresenceSampler:
+    """
+    Samples a distance sensor in a background thread and publishes presence events.
+
+    Each reading goes through a median filter, which drops isolated spikes, then an
+    exponential moving average. The average is reset to the median whenever the median
+    crosses approach_distance, so it only smooths readings taken on the same side, and
+    an object coming from far away is detected as soon as the median sees it. An object
+    is present once the filtered distance falls below enter_distance, and gone once it
+    rises above enter_distance + hysteresis, so an object held near the threshold does
+    not trigger repeatedly.
+
+    The sensor is sampled every idle_interval while nothing is near, and every
+    active_interval once something is closer than approach_distance or present.
+
+    Subscribers are called from the sampler thread with the PresenceEvent and the
+    filtered distance, and must not block.
+    """
+
+    def __init__(self, sensor: DistanceSensor, enter_distance=10, hysteresis=4, window=5, ema_alpha=0.5,
+                 idle_interval=0.3, active_interval=0.05, approach_distance=40):
+        """
+        :param sensor: The distance sensor to sample.
+        :param enter_distance: Filtered distance (in cm) below which an object is present.
+        :param hysteresis: Extra distance (in cm) the object must move away for it to be gone.
+        :param window: Number of readings of the median filter.
+        :param ema_alpha: Weight of the newest median in the moving average, between 0 and 1.
+        :param idle_interval: Time (in seconds) between readings while nothing is near.
+        :param active_interval: Time (in seconds) between readings while something is near.
+        :param approach_distance: Distance (in cm) below which the sensor is sampled at the active rate.
+        """
+        self.sensor = sensor
+        self.enter_distance = enter_distance
+        self.exit_distance = enter_distance + hysteresis
+        self.ema_alpha = ema_alpha
+        self.idle_interval = idle_interval
+        self.active_interval = active_interval
+        self.approach_distance = approach_distance
+        self.distance = None
+        self.last_reading = None
+        self.present = False
+        self.samples = 0
+        self._readings = deque(maxlen=window)
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def subscribe(self, callback):
+        """
+        Registers a function called with (PresenceEvent, distance) on each presence change.
+        :return: A function removing the subscription.
+        """
+        with self._lock:
+            self._subscribers.append(callback)
+
+        def unsubscribe():
+            with self._lock:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+        return unsubscribe
+
+    def _publish(self, event: PresenceEvent, distance: float):
+        logger.info(f"Presence {event.value} at {distance:.1f} cm")
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            try:
+                callback(event, distance)
+            except Exception as e:
+                logger.error(f"Error in presence subscriber: {e}")
+
+    def update(self, reading):
+        """
+        Filters a new reading and publishes an event if the presence changed.
+        :param reading: Distance in cm, or None if the measurement failed.
+        :return: The filtered distance.
+        """
+        if reading is None:
+            return self.distance
+
+        self.samples += 1
+        self.last_reading = reading
+        self._readings.append(reading)
+        median = statistics.median(self._readings)
+        if self.distance is None or (median < self.approach_distance) != (self.distance < self.approach_distance):
+            # Seed the average when an object approaches or moves away, so it does not lag behind
+            self.distance = median
+        else:
+            self.distance += self.ema_alpha * (median - self.distance)
+
+        if not self.present and self.distance < self.enter_distance:
+            self.present = True
+            self._publish(PresenceEvent.ENTERED, self.distance)
+        elif self.present and self.distance > self.exit_distance:
+            self.present = False
+            self._publish(PresenceEvent.LEFT, self.distance)
+        return self.distance
+
+    def interval(self) -> float:
+        """
+        Returns the time to wait before the next reading.
+        """
+        # The raw reading reacts to an approaching object before the filtered distance does
+        nearest = min((d for d in (self.distance, self.last_reading) if d is not None), default=None)
+        if self.present or (nearest is not None and nearest < self.approach_distance):
+            return self.active_interval
+        return self.idle_interval
+
+    def _sample_worker(self):
+        while not self._stopped.is_set():
+            try:
+                self.update(self.sensor.get_distance())
+            except Exception as e:
+                logger.error(f"Error sampling distance: {e}")
+            self._stopped.wait(self.interval())
+
+    def start(self):
+        """
+        Starts sampling in a background thread.
+        """
+        if self._thread is not None:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._sample_worker, daemon=True)
+        self._thread.start()
+        logger.info(f"Presence sampler started (enter below {self.enter_distance} cm, "
+                    f"leave above {self.exit_distance} cm)")
+
+    def stop(self):
+        """
+        Stops the background thread.
+        """
+        if self._thread is None:
+            return
+        self._stopped.set()
+        self._thread.join()
+        self._thread = None
@@ -0,0 +1,79 @@
+import time
+from hardware.motion_sensor.distance_sensor import DistanceSensor
+from utils.custom_logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def read_distance_trace(trace_path):
+    """
+    Reads a distance trace: one "<seconds> <distance in cm>" pair per line, in time order.
+    Blank lines and lines starting with # are ignored.
+    :param trace_path: Path to the trace file.
+    :return: List of (seconds, distance) tuples.
+    """
+    trace = []
+    with open(trace_path, "r") as trace_file:
+        for line in trace_file:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            seconds, distance = line.replace(",", " ").split()
+            trace.append((float(seconds), float(distance)))
+    if not trace:
+        raise ValueError(f"Distance trace is empty: {trace_path}")
+    return trace
+
+
+class SimulatedUltrasonicSensor(DistanceSensor):
+    """
+    Distance sensor replaying a recorded distance trace, to run the station without the HC-SR04.
+
+    The trace starts when the sensor is created, and each measurement returns the last
+    distance of the trace at or before the elapsed time. With loop set, the trace starts
+    over after its last entry.
+    """
+
+    def __init__(self, trace=None, trigger_distance=15, callback=None, loop=True, default_distance=400.0):
+        """
+        :param trace: Path to a trace file, or list of (seconds, distance) tuples. Nothing is ever detected when None.
+        :param trigger_distance: Distance (in cm) at which to trigger a response.
+        :param callback: Function to call when an object is detected.
+        :param loop: Whether to start the trace over after its last entry.
+        :param default_distance: Distance (in cm) returned without a trace, and before its first entry.
+        """
+        super().__init__(trigger_distance, callback)
+        if isinstance(trace, str):
+            trace = read_distance_trace(trace)
+        self.trace = trace or []
+        self.loop = loop
+        self.default_distance = default_distance
+        self.duration = self.trace[-1][0] if self.trace else 0.0
+        self._start_time = time.monotonic()
+        logger.info(f"Simulated Ultrasonic Sensor replaying {len(self.trace)} distances")
+
+    def get_distance(self):
+        """
+        Returns the distance of the trace at the current time.
+        :return: Distance in cm.
+        """
+        elapsed = time.monotonic() - self._start_time
+        if self.loop and self.duration > 0:
+            elapsed %= self.duration
+
+        distance = self.default_distance
+        for seconds, trace_distance in self.trace:
+            if seconds > elapsed:
+                break
+            distance = trace_distance
+        return round(distance, 2)
+
+    def read(self):
+        """
+        Returns the distance of the trace at the current time, which never requires waiting.
+        :return: Distance in cm.
+        """
+        return self.get_distance()
+
+    def cleanup(self):
+        logger.info("Simulated Ultrasonic Sensor cleaned up.")
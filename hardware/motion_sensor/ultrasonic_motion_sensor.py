@@ -1,94 +1,116 @@
+import threading
 import time
 import lgpio
+from hardware.motion_sensor.distance_sensor import DistanceSensor
 from utils.custom_logger import get_logger
 from utils.configuration import get_hardware_config
 
 logger = get_logger(__name__)
 
+# Speed of sound (~343 m/s) in cm per nanosecond, halved for the round trip of the echo
+CM_PER_ECHO_NS = 34300 / 1e9 / 2
 
-class UltrasonicSensor:
-    def __init__(self, trig_pin=23, echo_pin=24, trigger_distance=15, callback=None):
+
+class UltrasonicSensor(DistanceSensor):
+    """
+    HC-SR04 style ultrasonic sensor, ranged with GPIO edge alerts.
+
+    The echo pin is watched by an lgpio callback, which receives the kernel timestamp of
+    each edge, so the width of the echo pulse is measured without polling the pin and
+    without being disturbed by the Python scheduler. time.monotonic_ns is used when an
+    edge comes without a timestamp.
+
+    trigger starts a measurement and returns immediately, read returns the last distance
+    measured, and get_distance does both, waiting at most `timeout` for the echo.
+    """
+
+    def __init__(self, trig_pin=23, echo_pin=24, trigger_distance=15, callback=None, timeout=0.03):
         """
         Initializes the ultrasonic sensor.
         :param trig_pin: GPIO pin for the trigger signal.
         :param echo_pin: GPIO pin for receiving the echo signal.
         :param trigger_distance: Distance (in cm) at which to trigger a response.
         :param callback: Function to call when an object is detected.
+        :param timeout: Maximum time (in seconds) to wait for an echo. 30 ms covers the 4 m range of the sensor.
         """
+        super().__init__(trigger_distance, callback)
         self._hardware_config = get_hardware_config()
         self.trig_pin = self._hardware_config.get("TRIG_PIN", trig_pin)
         self.echo_pin = self._hardware_config.get("ECHO_PIN", echo_pin)
-        self.trigger_distance = trigger_distance
-        self.callback = callback
+        self.timeout = self._hardware_config.get("ULTRASONIC_TIMEOUT", timeout)
+        self.last_distance = None
+        self.last_reading_time = None
+        self.timeouts = 0
+        self._rise_ns = None
+        self._echo_received = threading.Event()
+        self._lock = threading.Lock()
 
         # Initialize GPIO chip
         self.chip = lgpio.gpiochip_open(0)
 
         # Setup GPIO
         lgpio.gpio_claim_output(self.chip, self.trig_pin)  # Trig as OUTPUT
-        lgpio.gpio_claim_input(self.chip, self.echo_pin)   # Echo as INPUT
+        lgpio.gpio_claim_alert(self.chip, self.echo_pin, lgpio.BOTH_EDGES)  # Echo as INPUT, reporting edges
+        self._edge_callback = lgpio.callback(self.chip, self.echo_pin, lgpio.BOTH_EDGES, self._on_edge)
 
         logger.info(f"Ultrasonic Sensor initialized on TRIG={self.trig_pin}, ECHO={self.echo_pin}")
 
-    def get_distance(self):
+    def _on_edge(self, chip, gpio, level, timestamp):
         """
-        Measures the distance to the nearest object using the ultrasonic sensor.
-        :return: Distance in cm.
+        Called by lgpio on each edge of the echo pin, with its timestamp in nanoseconds.
         """
-        # Send trigger pulse
-        lgpio.gpio_write(self.chip, self.trig_pin, 1)
-        time.sleep(0.00001)  # 10µs pulse
-        lgpio.gpio_write(self.chip, self.trig_pin, 0)
-
-        start_time = time.time()
-        stop_time = time.time()
-
-        # Wait for echo to start
-        while lgpio.gpio_read(self.chip, self.echo_pin) == 0:
-            start_time = time.time()
-
-        # Wait for echo to stop
-        while lgpio.gpio_read(self.chip, self.echo_pin) == 1:
-            stop_time = time.time()
-
-        # Calculate time difference
-        elapsed_time = stop_time - start_time
-
-        # Convert to distance (speed of sound is ~343m/s)
-        distance = (elapsed_time * 34300) / 2  # Convert to cm
-
-        return round(distance, 2)  # Return rounded distance
-
-    def start_monitoring(self, check_interval=0.5):
+        if not timestamp:
+            timestamp = time.monotonic_ns()
+
+        if level == 1:
+            # Echo started
+            self._rise_ns = timestamp
+        elif level == 0 and self._rise_ns is not None:
+            # Echo stopped: its width is the round trip time of the sound
+            elapsed_ns = timestamp - self._rise_ns
+            self._rise_ns = None
+            if elapsed_ns <= self.timeout * 1e9:
+                self.last_distance = round(elapsed_ns * CM_PER_ECHO_NS, 2)
+                self.last_reading_time = time.monotonic()
+                self._echo_received.set()
+
+    def trigger(self):
         """
-        Continuously monitors distance and triggers the callback when an object is detected.
-        :param check_interval: Time (in seconds) between distance checks.
+        Starts a measurement and returns immediately. The distance is available from read once the echo is received.
         """
-        logger.info(f"Starting ultrasonic sensor monitoring... " +
-                    f"(Trigger distance: {self.trigger_distance} cm)")
-
-        try:
-            while True:
-                distance = self.get_distance()
-                logger.info(f"Measured distance: {distance} cm")
-
-                if distance < self.trigger_distance:
-                    logger.info(f"Object detected within {self.trigger_distance} cm!")
-
-                    if self.callback:  # Call the user-defined function
-                        if self.callback(distance):
-                            return
+        with self._lock:
+            self._rise_ns = None
+            self._echo_received.clear()
+            # Send trigger pulse
+            lgpio.gpio_write(self.chip, self.trig_pin, 1)
+            time.sleep(0.00001)  # 10µs pulse
+            lgpio.gpio_write(self.chip, self.trig_pin, 0)
+
+    def read(self):
+        """
+        Returns the last distance measured, without waiting.
+        :return: Distance in cm, or None if nothing was measured yet.
+        """
+        return self.last_distance
 
-                time.sleep(check_interval)  # Wait before next measurement
-        except KeyboardInterrupt:
-            logger.info("Ultrasonic sensor monitoring stopped.")
-        # finally:
-        #     self.cleanup()
+    def get_distance(self):
+        """
+        Measures the distance to the nearest object using the ultrasonic sensor.
+        :return: Distance in cm, or None if no echo was received before the timeout.
+        """
+        self.trigger()
+        if not self._echo_received.wait(self.timeout):
+            # Lost echoes are frequent, the timeouts counter tracks them
+            self.timeouts += 1
+            logger.debug(f"No echo received within {self.timeout * 1000:.0f} ms.")
+            return None
+        return self.last_distance
 
     def cleanup(self):
         """
         Cleans up GPIO resources.
         """
+        self._edge_callback.cancel()
         lgpio.gpiochip_close(self.chip)  # Close GPIO chip
         logger.info("Ultrasonic Sensor GPIO cleaned up.")
 
@@ -1,3 +1,7 @@
+import os
+import threading
+import time
+from collections import OrderedDict
 import pygame
 import numpy as np
 from utils.custom_logger import get_logger
@@ -5,12 +9,58 @@ from utils.custom_logger import get_logger
 # Initialize the logger
 logger = get_logger(__name__)
 
+# Gain is applied in fixed point with GAIN_BITS fractional bits, in int32 blocks of GAIN_BLOCK_SIZE samples.
+# 16 bit samples times a gain below 2 ** (31 - 16 - GAIN_BITS) = 16 cannot overflow int32.
+GAIN_BITS = 11
+GAIN_BLOCK_SIZE = 1 << 16
+
+
+def apply_gain(samples: np.ndarray, factor: float):
+    """
+    Amplifies the samples in place, clipping them to the range of their type.
+    Integer samples are scaled in fixed point through a small integer buffer, so no
+    float64 copy of the whole sound is ever made.
+
+    :param samples: The samples, modified in place.
+    :param factor: The factor to amplify the samples by.
+    """
+    if factor == 1.0:
+        return
+
+    if not np.issubdtype(samples.dtype, np.integer):
+        np.multiply(samples, samples.dtype.type(factor), out=samples)
+        np.clip(samples, -1.0, 1.0, out=samples)
+        return
+    if samples.size == 0:
+        return
+
+    limits = np.iinfo(samples.dtype)
+    # 32 bit samples need 64 bit intermediates
+    block_type = np.int32 if samples.itemsize <= 2 else np.int64
+    gain = block_type(round(min(factor, 15.99) * (1 << GAIN_BITS)))
+    # Slices along the first axis are always views, whatever the layout of the samples
+    rows = max(1, GAIN_BLOCK_SIZE * len(samples) // samples.size)
+    block = np.empty((min(rows, len(samples)),) + samples.shape[1:], dtype=block_type)
+    for start in range(0, len(samples), rows):
+        chunk = samples[start:start + rows]
+        scaled = block[:len(chunk)]
+        scaled[...] = chunk
+        scaled *= gain
+        scaled >>= GAIN_BITS
+        np.clip(scaled, limits.min, limits.max, out=scaled)
+        chunk[...] = scaled
+
 
 class Speaker:
-    def __init__(self):
+    def __init__(self, cache_size: int = 32):
         """
         Initialize the Speaker instance.
+        :param cache_size: Number of decoded and amplified sounds kept in memory.
         """
+        self.cache_size = cache_size
+        self._sounds = OrderedDict()
+        self._ends_at = 0.0
+        self._stopped = threading.Event()
         try:
             pygame.mixer.init()
             self.channel = pygame.mixer.Channel(1)
@@ -20,19 +70,54 @@ class Speaker:
             logger.error(f"Failed to initialize speaker: {e}")
             self.channel = None
 
-    def play(self, filename: str):
+    def play(self, filename: str) -> bool:
         """
-        Play the sound file.
-        :param sound: The pygame.mixer.Sound object.
+        Start playing the sound file and return immediately. Use wait to know when it is over.
+        :param filename: The sound file.
+        :return: True if the sound started playing.
         """
         try:
-            sound = self._make_sound(filename, self.volume)
+            sound = self._get_sound(filename, self.volume)
+            self._stopped.clear()
             self.channel.play(sound)
-            while self.channel.get_busy():
-                pygame.time.wait(100)
-            logger.debug(f"Sound played: {filename}")
+            self._ends_at = time.monotonic() + sound.get_length()
+            logger.debug(f"Sound playing: {filename}")
+            return True
         except Exception as e:
             logger.error(f"Error playing sound: {e}")
+            return False
+
+    def is_playing(self) -> bool:
+        """
+        Returns True while a sound is playing.
+        """
+        return self.channel is not None and self.channel.get_busy()
+
+    def wait(self, timeout: float = None) -> bool:
+        """
+        Block until the sound being played is over, or it is stopped.
+        :param timeout: Maximum time (in seconds) to wait.
+        :return: False if the timeout expired first.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        # Sleep for the known length of the sound, then for the tail still buffered by the mixer
+        while True:
+            now = time.monotonic()
+            remaining = max(self._ends_at - now, 0.01)
+            if deadline is not None:
+                if now >= deadline:
+                    return False
+                remaining = min(remaining, deadline - now)
+            if self._stopped.wait(remaining) or not self.is_playing():
+                return True
+
+    def stop(self):
+        """
+        Stop the sound being played.
+        """
+        self._stopped.set()
+        if self.channel is not None:
+            self.channel.stop()
 
     def set_volume(self, volume: float):
         """
@@ -41,6 +126,27 @@ class Speaker:
         """
         self.volume = volume
 
+    def _get_sound(self, filename: str, factor: float) -> pygame.mixer.Sound:
+        """
+        Return the sound of the file amplified by the factor, decoding it only once.
+        Sounds are kept until the file changes or they are the least recently used of cache_size sounds.
+
+        :param filename: The filename of the sound file.
+        :param factor: The factor to amplify the sound by.
+        """
+        stat = os.stat(filename)
+        key = (os.path.abspath(filename), stat.st_mtime_ns, stat.st_size, factor)
+        sound = self._sounds.get(key)
+        if sound is not None:
+            self._sounds.move_to_end(key)
+            return sound
+
+        sound = self._make_sound(filename, factor)
+        self._sounds[key] = sound
+        while len(self._sounds) > self.cache_size:
+            self._sounds.popitem(last=False)
+        return sound
+
     def _make_sound(self, filename: str, factor: float) -> pygame.mixer.Sound:
         """
         Make a sound object from the file and amplify it by the factor.
@@ -48,20 +154,19 @@ class Speaker:
         :param filename: The filename of the sound file.
         :param factor: The factor to amplify the sound by.
         """
-        try:
-            sound = pygame.mixer.Sound(filename)
-            samples = pygame.sndarray.array(sound)
-            amplified_samples = np.clip(
-                samples * factor, -32768, 32767).astype(np.int16)
-            amplified_sound = pygame.sndarray.make_sound(amplified_samples)
-            logger.debug(f"Sound amplified by {factor}.")
-            return amplified_sound
-        except Exception as e:
-            logger.error(f"Error making sound: {e}")
-            return None
+        sound = pygame.mixer.Sound(filename)
+        if factor == 1.0:
+            return sound
+
+        # The array references the decoded samples, so the sound itself is amplified without a copy
+        samples = pygame.sndarray.samples(sound)
+        apply_gain(samples, factor)
+        logger.debug(f"Sound amplified by {factor}.")
+        return sound
 
 
 if __name__ == "__main__":
     speaker = Speaker()
     speaker.set_volume(5.0)
     speaker.play('/usr/share/sounds/alsa/Front_Center.wav')
+    speaker.wait()
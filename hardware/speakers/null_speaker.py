@@ -0,0 +1,105 @@
+import os
+import threading
+import time
+import wave
+from dataclasses import dataclass
+from utils.custom_logger import get_logger
+
+# Initialize the logger
+logger = get_logger(__name__)
+
+
+@dataclass
+class Playback:
+    """
+    A sound played by the NullSpeaker.
+
+    Contains the following fields:
+    - filename: the sound file
+    - started_at: time.monotonic() value when playback started
+    - duration: estimated length of the sound, in seconds
+    """
+
+    filename: str
+    started_at: float
+    duration: float
+
+
+class NullSpeaker:
+    """
+    Audio sink with the same interface as Speaker that plays nothing, to run the station without a sound card.
+
+    Each sound is recorded with its start time and estimated duration. With realtime set,
+    wait blocks until the sound would be over, like the real speaker does.
+    """
+
+    def __init__(self, realtime: bool = True, mp3_bitrate: int = 32000):
+        """
+        :param realtime: Whether wait blocks for the duration of the sound.
+        :param mp3_bitrate: Bitrate (in bits per second) used to estimate the duration of MP3 files.
+        """
+        self.realtime = realtime
+        self.mp3_bitrate = mp3_bitrate
+        self.volume = 1.0
+        self.playbacks = []
+        self._ends_at = 0.0
+        self._stopped = threading.Event()
+        logger.info("Null speaker initialized.")
+
+    def duration(self, filename: str) -> float:
+        """
+        Estimates the length (in seconds) of a sound file.
+        WAV files are read exactly, other files are assumed to be constant bitrate MP3.
+        """
+        try:
+            if filename.lower().endswith(".wav"):
+                with wave.open(filename, "rb") as wav_file:
+                    return wav_file.getnframes() / wav_file.getframerate()
+            return os.path.getsize(filename) * 8 / self.mp3_bitrate
+        except Exception as e:
+            logger.error(f"Error reading sound duration: {e}")
+            return 0.0
+
+    def play(self, filename: str) -> bool:
+        """
+        Records the sound and returns immediately.
+        :param filename: The sound file.
+        :return: True, the sound always starts playing.
+        """
+        playback = Playback(filename, time.monotonic(), self.duration(filename))
+        self.playbacks.append(playback)
+        self._stopped.clear()
+        self._ends_at = playback.started_at + playback.duration if self.realtime else playback.started_at
+        logger.debug(f"Sound played: {filename} ({playback.duration:.2f} s)")
+        return True
+
+    def is_playing(self) -> bool:
+        """
+        Returns True until the sound would be over.
+        """
+        return not self._stopped.is_set() and time.monotonic() < self._ends_at
+
+    def wait(self, timeout: float = None) -> bool:
+        """
+        Block until the sound would be over, or it is stopped.
+        :param timeout: Maximum time (in seconds) to wait.
+        :return: False if the timeout expired first.
+        """
+        remaining = max(self._ends_at - time.monotonic(), 0.0)
+        if timeout is not None and timeout < remaining:
+            return self._stopped.wait(timeout)
+        self._stopped.wait(remaining)
+        return True
+
+    def stop(self):
+        """
+        Stop the sound being played.
+        """
+        self._stopped.set()
+
+    def set_volume(self, volume: float):
+        """
+        Set the volume of the speaker.
+        :param volume: The volume of the speaker.
+        """
+        self.volume = volume
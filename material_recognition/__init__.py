@@ -1,3 +1,19 @@
+from .classifier import Classifier
 from .client import OpenAIClient
+from .async_client import AsyncOpenAIClient
+from .local_classifier import LocalClassifier
+from .result_cache import CachedClassifier, ResultCache, perceptual_hash
+from .part_batcher import PartBatcher
+from .speculative import SpeculativeClassifier
+from .factory import create_classifier
 
-assert OpenAIClient
\ No newline at end of file
+assert Classifier
+assert OpenAIClient
+assert AsyncOpenAIClient
+assert LocalClassifier
+assert CachedClassifier
+assert ResultCache
+assert perceptual_hash
+assert PartBatcher
+assert SpeculativeClassifier
+assert create_classifier
@@ -0,0 +1,318 @@
+import asyncio
+import os
+import random
+from typing import AsyncIterator
+
+import httpx
+from dotenv import load_dotenv
+from openai import APIConnectionError, APITimeoutError, AsyncOpenAI, InternalServerError, RateLimitError
+from openai.types.chat.chat_completion import ChatCompletion
+
+from utils.custom_logger import get_logger
+from .client import OpenAIClient
+from .prompt_output import parse_api_response, parse_part_names, ResponseComponent, ResponseParseError, \
+    ResponseStreamParser
+from .utils import base64_encode_image, ImageInput
+
+logger = get_logger(__name__)
+
+# Errors worth retrying: the request may succeed on a second attempt
+RETRYABLE_ERRORS = (asyncio.TimeoutError, APIConnectionError, APITimeoutError, RateLimitError, InternalServerError)
+
+
+class AsyncOpenAIClient:
+    """
+    Asynchronous counterpart of OpenAIClient.
+
+    prompt and prompt_which_part are coroutines, so the event loop can overlap
+    recognition with sensing and speech. All requests share a single keep-alive
+    HTTP connection pool, each call has a deadline, failed calls are retried with
+    jittered exponential backoff, and at most max_concurrency requests are in flight.
+    """
+
+    def __init__(self, municipality: str = "Montreal", model: str = "gpt-4o", temperature: int = 0, max_tokens: int = 1024,
+                 timeout: float = 20.0, max_retries: int = 2, backoff: float = 0.5, max_concurrency: int = 4,
+                 upload_max_edge: int = 1024, upload_quality: int = 85, structured_output: bool = True,
+                 max_parse_retries: int = 1, base_url: str = None):
+        """
+        Parameters
+        ----------
+        municipality : str
+            The municipality whose waste management rules are used.
+        model : str
+            The OpenAI model to use.
+        temperature : int
+            The sampling temperature.
+        max_tokens : int
+            The maximum number of tokens generated per call.
+        timeout : float
+            Default deadline (in seconds) of a call, including retries.
+        max_retries : int
+            Number of times a failed call is retried.
+        backoff : float
+            Base delay (in seconds) of the exponential backoff between retries.
+        max_concurrency : int
+            Maximum number of requests in flight at once.
+        upload_max_edge : int
+            Maximum length (in pixels) of the longest edge of uploaded images.
+        upload_quality : int
+            JPEG quality of uploaded images.
+        structured_output : bool
+            Whether the model output is constrained to the response JSON schema.
+        max_parse_retries : int
+            Number of times the request is sent again when its output cannot be parsed.
+        base_url : str
+            Base URL of the api, e.g. a local stand-in server. Uses OpenAI's when None.
+        """
+        load_dotenv(".env")
+        api_key = os.environ.get("API_KEY")
+        self.http_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency,
+                                keepalive_expiry=60),
+            timeout=httpx.Timeout(timeout))
+        # Retries are handled here so they count against the call's deadline
+        self.client = AsyncOpenAI(api_key=api_key, http_client=self.http_client, max_retries=0, base_url=base_url)
+        self.model = model
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        self.municipality = municipality
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.upload_max_edge = upload_max_edge
+        self.upload_quality = upload_quality
+        self.structured_output = structured_output
+        self.max_parse_retries = max_parse_retries
+        self.parse_failures = 0
+        self.parse_retries = 0
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    def stats(self) -> dict:
+        """
+        Returns the parse failure and retry counters.
+        """
+        return {"parse_failures": self.parse_failures, "parse_retries": self.parse_retries}
+
+    async def _create(self, messages: list[dict], timeout: float = None, **options) -> ChatCompletion:
+        """
+        Sends a chat completion request, retrying retryable errors until the deadline.
+
+        Parameters
+        ----------
+        messages : list[dict]
+            The messages to send to the chat completions api.
+        timeout : float
+            Deadline (in seconds) of the call. Uses the client's default when None.
+        options : dict
+            Extra arguments passed to the chat completions api.
+
+        Returns
+        -------
+        ChatCompletion
+            The completion returned by the api.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + (timeout or self.timeout)
+
+        async def request(remaining: float) -> ChatCompletion:
+            # Waiting for a free slot counts against the deadline too
+            async with self._semaphore:
+                return await self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    temperature=self.temperature,
+                    max_tokens=self.max_tokens,
+                    timeout=remaining,
+                    **options,
+                )
+
+        for attempt in range(self.max_retries + 1):
+            remaining = deadline - loop.time()
+            try:
+                return await asyncio.wait_for(request(remaining), remaining)
+            except RETRYABLE_ERRORS as e:
+                # Full jitter keeps retries from several stations from arriving together
+                delay = random.uniform(0, self.backoff * 2 ** attempt)
+                if attempt == self.max_retries or loop.time() + delay >= deadline:
+                    raise
+                logger.warning(f"OpenAI request failed ({e!r}), retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+    async def _encode_image(self, image: ImageInput) -> str:
+        """
+        Downscales and re-encodes the image off the event loop, then base64 encodes it for the api.
+        """
+        return await asyncio.to_thread(base64_encode_image, image, self.upload_max_edge, self.upload_quality)
+
+    async def prompt(self, image_path: ImageInput, timeout: float = None) -> list[ResponseComponent]:
+        """
+        Prompts the OpenAI api and returns a list of ResponseComponent objects containing data generated
+        by the model.
+
+        Parameters
+        ----------
+        image_path : ImageInput
+            The path to the image to use for the prompt, or the image itself as a BGR array or PIL image.
+        timeout : float
+            Deadline (in seconds) of the call. Uses the client's default when None.
+
+        Returns
+        -------
+        list[ResponseComponent]
+            A list of ResponseComponent objects containing relevant data generated by the model.
+        """
+        image_bytes = await self._encode_image(image_path)
+        prompt_text = OpenAIClient._format_prompt(self.municipality, self.structured_output)
+        messages = OpenAIClient._build_messages(prompt_text, image_bytes)
+
+        for attempt in range(self.max_parse_retries + 1):
+            response = await self._create(messages, timeout, **self._output_options())
+            content = response.choices[0].message.content or ""
+            try:
+                return parse_api_response(content)
+            except ResponseParseError as e:
+                self.parse_failures += 1
+                logger.warning(f"Could not parse model output: {e}")
+                if attempt < self.max_parse_retries:
+                    self.parse_retries += 1
+
+        try:
+            return parse_api_response(content, strict=False)
+        except ResponseParseError:
+            return []
+
+    def _output_options(self) -> dict:
+        """
+        Returns the extra completion arguments enforcing the response schema, if enabled.
+        """
+        return {"response_format": OpenAIClient.RESPONSE_FORMAT} if self.structured_output else {}
+
+    async def prompt_stream(self, image_path: ImageInput, timeout: float = None) -> AsyncIterator[ResponseComponent]:
+        """
+        Prompts the OpenAI api with a streamed completion and yields each ResponseComponent as soon
+        as the model has finished generating it. The stream is not retried on network errors once it
+        has started. An output that is not a complete list of valid components is sent again, like in
+        prompt, and the components already yielded are not yielded again.
+
+        Parameters
+        ----------
+        image_path : ImageInput
+            The path to the image to use for the prompt, or the image itself as a BGR array or PIL image.
+        timeout : float
+            Deadline (in seconds) of the whole stream. Uses the client's default when None.
+
+        Returns
+        -------
+        AsyncIterator[ResponseComponent]
+            The ResponseComponent objects generated by the model, in order.
+        """
+        image_bytes = await self._encode_image(image_path)
+        prompt_text = OpenAIClient._format_prompt(self.municipality, self.structured_output)
+        loop = asyncio.get_running_loop()
+        # Only the time spent waiting on the network counts against the deadline,
+        # not the time the consumer spends on the yielded components
+        remaining = timeout or self.timeout
+
+        async def read(awaitable):
+            nonlocal remaining
+            started = loop.time()
+            try:
+                # A concurrency slot is only held while reading from the network
+                async with self._semaphore:
+                    async with asyncio.timeout(remaining):
+                        return await awaitable
+            finally:
+                remaining -= loop.time() - started
+
+        yielded = set()
+        for attempt in range(self.max_parse_retries + 1):
+            stream = await read(self.client.chat.completions.create(
+                model=self.model,
+                messages=OpenAIClient._build_messages(prompt_text, image_bytes),
+                temperature=self.temperature,
+                max_tokens=self.max_tokens,
+                stream=True,
+                **self._output_options(),
+            ))
+            parser = ResponseStreamParser()
+            chunks = aiter(stream)
+            try:
+                while True:
+                    try:
+                        chunk = await read(anext(chunks))
+                    except StopAsyncIteration:
+                        break
+                    if not chunk.choices or not chunk.choices[0].delta.content:
+                        continue
+                    for component in parser.feed(chunk.choices[0].delta.content):
+                        # A retry does not repeat the components already yielded
+                        if component.component_name.lower() not in yielded:
+                            yielded.add(component.component_name.lower())
+                            yield component
+            finally:
+                # Release the connection, also when the consumer stops early
+                await stream.close()
+            if parser.finish():
+                return
+
+            self.parse_failures += 1
+            logger.warning("Could not parse streamed model output: it has invalid components or is incomplete")
+            if attempt < self.max_parse_retries:
+                self.parse_retries += 1
+
+    async def prompt_which_part(self, part_image_path: ImageInput, component_names: list[str], timeout: float = None) -> str:
+        """
+        Asks the OpenAI api which of the components is in the image.
+
+        Parameters
+        ----------
+        part_image_path : ImageInput
+            The path to the image of the part that was disposed of, or the image itself.
+        component_names : list[str]
+            The names of the components the part can be.
+        timeout : float
+            Deadline (in seconds) of the call. Uses the client's default when None.
+
+        Returns
+        -------
+        str
+            The name of the component in the image, or "Unidentified".
+        """
+        image_bytes = await self._encode_image(part_image_path)
+        prompt_text = OpenAIClient.PART_PROMPT_TEMPLATE.format(", ".join(component_names))
+        response = await self._create(OpenAIClient._build_messages(prompt_text, image_bytes), timeout)
+        return response.choices[0].message.content
+
+    async def prompt_which_parts(self, part_images: list[ImageInput], component_names: list[str],
+                                 timeout: float = None) -> list[str]:
+        """
+        Identifies several parts in a single multi-image request.
+
+        Parameters
+        ----------
+        part_images : list[ImageInput]
+            The images of the parts that were disposed of.
+        component_names : list[str]
+            The names of the components the parts can be.
+        timeout : float
+            Deadline (in seconds) of the call. Uses the client's default when None.
+
+        Returns
+        -------
+        list[str]
+            The name of the component in each image, in the order of the images.
+        """
+        if not part_images:
+            return []
+        if len(part_images) == 1:
+            return [await self.prompt_which_part(part_images[0], component_names, timeout)]
+        images_bytes = await asyncio.gather(*[self._encode_image(image) for image in part_images])
+        prompt_text = OpenAIClient._generate_multiple_parts_prompt(len(part_images), component_names)
+        response = await self._create(OpenAIClient._build_messages(prompt_text, *images_bytes), timeout)
+        return parse_part_names(response.choices[0].message.content, len(part_images))
+
+    async def close(self):
+        """
+        Closes the shared HTTP connection pool.
+        """
+        await self.client.close()
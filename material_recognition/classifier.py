@@ -0,0 +1,85 @@
+from abc import ABC, abstractmethod
+from typing import Iterator
+
+from .prompt_output import ResponseComponent
+from .utils import ImageInput
+
+
+class Classifier(ABC):
+    """
+    Interface implemented by every material recognition backend.
+
+    A backend identifies the components of an item to dispose of, and which of
+    those components was later dropped in a bin.
+    """
+
+    @abstractmethod
+    def prompt(self, image_path: ImageInput) -> list[ResponseComponent]:
+        """
+        Identifies the components of the item in the image.
+
+        Parameters
+        ----------
+        image_path : ImageInput
+            The path to the image of the item, or the image itself as a BGR array or PIL image.
+
+        Returns
+        -------
+        list[ResponseComponent]
+            A list of ResponseComponent objects, one per component of the item.
+        """
+
+    def prompt_stream(self, image_path: ImageInput) -> Iterator[ResponseComponent]:
+        """
+        Identifies the components of the item in the image, yielding each component as soon as
+        it is available. Backends that can stream their output override this, the default yields
+        the result of prompt.
+
+        Parameters
+        ----------
+        image_path : ImageInput
+            The path to the image of the item, or the image itself as a BGR array or PIL image.
+
+        Returns
+        -------
+        Iterator[ResponseComponent]
+            The components of the item, in order.
+        """
+        yield from self.prompt(image_path)
+
+    @abstractmethod
+    def prompt_which_part(self, part_image_path: ImageInput, component_names: list[str]) -> str:
+        """
+        Identifies which of the known components is in the image.
+
+        Parameters
+        ----------
+        part_image_path : ImageInput
+            The path to the image of the part that was disposed of, or the image itself.
+        component_names : list[str]
+            The names of the components the part can be.
+
+        Returns
+        -------
+        str
+            The name of the component in the image, or "Unidentified".
+        """
+
+    def prompt_which_parts(self, part_images: list[ImageInput], component_names: list[str]) -> list[str]:
+        """
+        Identifies several parts at once. Backends that can batch requests override this,
+        the default identifies each part in turn.
+
+        Parameters
+        ----------
+        part_images : list[ImageInput]
+            The images of the parts that were disposed of.
+        component_names : list[str]
+            The names of the components the parts can be.
+
+        Returns
+        -------
+        list[str]
+            The name of the component in each image, in the order of the images.
+        """
+        return [self.prompt_which_part(image, component_names) for image in part_images]
@@ -1,14 +1,20 @@
 from dotenv import load_dotenv
 import os
+from typing import Iterator
 
 from openai import OpenAI
 from openai.types.chat.chat_completion import ChatCompletion
 
-from .utils import base64_encode_image_from_file
-from .prompt_output import parse_api_response, ResponseComponent
+from .classifier import Classifier
+from .utils import base64_encode_image, ImageInput
+from .prompt_output import parse_api_response, parse_part_names, ResponseComponent, ResponseParseError, \
+    ResponseStreamParser, RESPONSE_SCHEMA
+from utils.custom_logger import get_logger
 
+logger = get_logger(__name__)
 
-class OpenAIClient(OpenAI):
+
+class OpenAIClient(Classifier):
 
     client: OpenAI
     PROMPT_TEMPLATE: str = """
@@ -25,8 +31,13 @@ Questions:
 Format:
 
 Return Format:
-- Return only a list of JSON objects, where each object contains a "component", "description", "material", and "disposable_category" field. Only return
+{1}"""
+
+    # Return format of PROMPT_TEMPLATE, matching the output mode
+    LIST_RETURN_FORMAT: str = """- Return only a list of JSON objects, where each object contains a "component", "description", "material", and "disposable_category" field. Only return
 the JSON objects absolutely no prose. Do not include ```json to start or ``` to end."""
+    STRUCTURED_RETURN_FORMAT: str = """- Return a JSON object with a "components" field, holding one object per component with a "component", "description", "material",
+"recycling_number" (null if unknown) and "disposable_category" field."""
 
     PART_PROMPT_TEMPLATE: str = """
 Instructions:
@@ -42,14 +53,55 @@ Return Format:
 - Return a single string containing the name of the component and nothing else. The only exception is when you can't identify
 the object, in which case, answer with "Unidentified"."""
 
-    def __init__(self, municipality: str = "Montreal", model: str = "gpt-4o", temperature: int = 0, max_tokens: int = 1024):
+    MULTI_PART_PROMPT_TEMPLATE: str = """
+Instructions:
+- Analyze the {0} provided images, each of which represents an item that was disposed of.
+- Each image should only contain one component.
+- For each image, determine which of the possible components is present in the photo.
+- The items should be among the following: {1}
+
+Questions:
+- For each image, in the order they were provided, tell me what component of the object is in the image.
+
+Return Format:
+- Return only a JSON list of {0} strings, one per image in the same order, each containing the name of the component and nothing else.
+The only exception is when you can't identify the object in an image, in which case, use "Unidentified" for that image.
+Do not include ```json to start or ``` to end."""
+
+    # Structured output: the model is constrained to RESPONSE_SCHEMA
+    RESPONSE_FORMAT: dict = {
+        "type": "json_schema",
+        "json_schema": {"name": "disposal_components", "strict": True, "schema": RESPONSE_SCHEMA},
+    }
+
+    def __init__(self, municipality: str = "Montreal", model: str = "gpt-4o", temperature: int = 0, max_tokens: int = 1024,
+                 timeout: float = 20.0, max_retries: int = 2, upload_max_edge: int = 1024, upload_quality: int = 85,
+                 structured_output: bool = True, max_parse_retries: int = 1, base_url: str = None):
         load_dotenv(".env")
         api_key = os.environ.get("API_KEY")
-        self.client = OpenAI(api_key=api_key)
+        self.client = OpenAI(api_key=api_key, timeout=timeout, max_retries=max_retries, base_url=base_url)
         self.model = model
         self.temperature = temperature
         self.max_tokens = max_tokens
         self.municipality = municipality
+        self.upload_max_edge = upload_max_edge
+        self.upload_quality = upload_quality
+        self.structured_output = structured_output
+        self.max_parse_retries = max_parse_retries
+        self.parse_failures = 0
+        self.parse_retries = 0
+
+    def _output_options(self) -> dict:
+        """
+        Returns the extra completion arguments enforcing the response schema, if enabled.
+        """
+        return {"response_format": OpenAIClient.RESPONSE_FORMAT} if self.structured_output else {}
+
+    def stats(self) -> dict:
+        """
+        Returns the parse failure and retry counters.
+        """
+        return {"parse_failures": self.parse_failures, "parse_retries": self.parse_retries}
 
     def _prompt_model(self, image_bytes: bytes) -> list[ResponseComponent]:
         """
@@ -64,30 +116,78 @@ the object, in which case, answer with "Unidentified"."""
         -------
         list[ResponseComponent]
             A list of ResponseComponent objects containing relevant data created from the model.
+            If the output is still invalid after every retry, only its valid components are returned.
         """
-        response: ChatCompletion = self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {
-                    "role": "user",
-                    "content": [
-                        {
-                            "type": "text",
-                            "text": self._generate_prompt(),
-                        },
-                        {
-                            "type": "image_url",
-                            "image_url": {"url": f"data:image/jpeg;base64,{image_bytes}"},
-                        },
-                    ],
-                }
-            ],
-            temperature=self.temperature,
-            max_tokens=self.max_tokens
-        )
+        for attempt in range(self.max_parse_retries + 1):
+            response: ChatCompletion = self.client.chat.completions.create(
+                model=self.model,
+                messages=self._build_messages(self._generate_prompt(), image_bytes),
+                temperature=self.temperature,
+                max_tokens=self.max_tokens,
+                **self._output_options()
+            )
+
+            content = response.choices[0].message.content or ""
+            try:
+                return parse_api_response(content)
+            except ResponseParseError as e:
+                self.parse_failures += 1
+                logger.warning(f"Could not parse model output: {e}")
+                if attempt < self.max_parse_retries:
+                    self.parse_retries += 1
 
-        return parse_api_response(response.choices[0].message.content)
+        try:
+            return parse_api_response(content, strict=False)
+        except ResponseParseError:
+            return []
     
+    def _prompt_model_stream(self, image_bytes: bytes) -> Iterator[ResponseComponent]:
+        """
+        Prompts the model with a streamed completion and yields each ResponseComponent as soon as
+        its JSON object is complete.
+
+        Like _prompt_model, an output that is not a complete list of valid components is counted
+        as a parse failure and the request is sent again, up to max_parse_retries times. The
+        components already yielded are not yielded again by the retries.
+
+        Parameters
+        ----------
+        image_bytes : bytes
+            The base64 encoded bytes generated from the image to send to the api.
+
+        Returns
+        -------
+        Iterator[ResponseComponent]
+            The ResponseComponent objects created from the model, in order.
+        """
+        yielded = set()
+        for attempt in range(self.max_parse_retries + 1):
+            stream = self.client.chat.completions.create(
+                model=self.model,
+                messages=self._build_messages(self._generate_prompt(), image_bytes),
+                temperature=self.temperature,
+                max_tokens=self.max_tokens,
+                stream=True,
+                **self._output_options()
+            )
+
+            parser = ResponseStreamParser()
+            with stream:
+                for chunk in stream:
+                    if not chunk.choices or not chunk.choices[0].delta.content:
+                        continue
+                    for component in parser.feed(chunk.choices[0].delta.content):
+                        if component.component_name.lower() not in yielded:
+                            yielded.add(component.component_name.lower())
+                            yield component
+            if parser.finish():
+                return
+
+            self.parse_failures += 1
+            logger.warning("Could not parse streamed model output: it has invalid components or is incomplete")
+            if attempt < self.max_parse_retries:
+                self.parse_retries += 1
+
     def _prompt_model_for_individual_part(self, image_bytes: bytes, item_component_names: list[str]) -> str:
         """
         Prompts the model and returns a list of ResponseComponents containing relevant data created by the model.
@@ -104,27 +204,88 @@ the object, in which case, answer with "Unidentified"."""
         """
         response: ChatCompletion = self.client.chat.completions.create(
             model=self.model,
-            messages=[
-                {
-                    "role": "user",
-                    "content": [
-                        {
-                            "type": "text",
-                            "text": self._generate_individual_item_prompt(item_component_names),
-                        },
-                        {
-                            "type": "image_url",
-                            "image_url": {"url": f"data:image/jpeg;base64,{image_bytes}"},
-                        },
-                    ],
-                }
-            ],
+            messages=self._build_messages(self._generate_individual_item_prompt(item_component_names), image_bytes),
             temperature=self.temperature,
             max_tokens=self.max_tokens
         )
 
         return response.choices[0].message.content
 
+    def _prompt_model_for_multiple_parts(self, images_bytes: list[bytes], item_component_names: list[str]) -> list[str]:
+        """
+        Prompts the model with several part images in a single request.
+
+        Parameters
+        ----------
+        images_bytes : list[bytes]
+            The base64 encoded bytes generated from each image to send to the api.
+        item_component_names : list[str]
+            The names of the components the parts can be.
+
+        Returns
+        -------
+        list[str]
+            The name of the component in each image, in the order of the images.
+        """
+        response: ChatCompletion = self.client.chat.completions.create(
+            model=self.model,
+            messages=self._build_messages(
+                self._generate_multiple_parts_prompt(len(images_bytes), item_component_names), *images_bytes),
+            temperature=self.temperature,
+            max_tokens=self.max_tokens
+        )
+
+        return parse_part_names(response.choices[0].message.content, len(images_bytes))
+
+    @staticmethod
+    def _build_messages(prompt_text: str, *images_bytes: bytes) -> list[dict]:
+        """
+        Builds the chat messages sending a prompt along with one or more images.
+
+        Parameters
+        ----------
+        prompt_text : str
+            The instructions to send to the model.
+        images_bytes : bytes
+            The base64 encoded bytes generated from each image to send to the api.
+
+        Returns
+        -------
+        list[dict]
+            The messages to send to the chat completions api.
+        """
+        return [
+            {
+                "role": "user",
+                "content": [
+                    {
+                        "type": "text",
+                        "text": prompt_text,
+                    },
+                    *[
+                        {
+                            "type": "image_url",
+                            "image_url": {"url": f"data:image/jpeg;base64,{image_bytes}"},
+                        }
+                        for image_bytes in images_bytes
+                    ],
+                ],
+            }
+        ]
+
+    @staticmethod
+    def _generate_multiple_parts_prompt(image_count: int, item_component_names: list[str]) -> str:
+        """
+        Generates a prompt identifying several parts from the multi-part prompt template.
+
+        Returns
+        -------
+        str
+            A string containing instructions to send to the model
+        """
+        names = ", ".join(item_component_names)
+        return OpenAIClient.MULTI_PART_PROMPT_TEMPLATE.format(image_count, names)
+
     def _generate_individual_item_prompt(self, item_component_names) -> str:
         """
         Generates a prompts from the prompt template.
@@ -146,26 +307,82 @@ the object, in which case, answer with "Unidentified"."""
         str
             A string containing instructions to send to the model/
         """
-        return OpenAIClient.PROMPT_TEMPLATE.format(self.municipality)
+        return OpenAIClient._format_prompt(self.municipality, self.structured_output)
 
-    def prompt(self, image_path: str) -> list[ResponseComponent]:
+    @staticmethod
+    def _format_prompt(municipality: str, structured_output: bool) -> str:
+        """
+        Fills the prompt template, asking for the {"components": [...]} object of the response schema
+        in structured output mode, and for a bare list of components otherwise.
+        """
+        return_format = OpenAIClient.STRUCTURED_RETURN_FORMAT if structured_output else OpenAIClient.LIST_RETURN_FORMAT
+        return OpenAIClient.PROMPT_TEMPLATE.format(municipality, return_format)
+
+    def _encode_image(self, image: ImageInput) -> str:
+        """
+        Downscales and re-encodes the image, then base64 encodes it for the api.
+        """
+        return base64_encode_image(image, self.upload_max_edge, self.upload_quality)
+
+    def prompt(self, image_path: ImageInput) -> list[ResponseComponent]:
         """
         Prompts the OpenAI api and returns a list of ResponseComponent objects containing data generated
         by the model.
 
         Parameters
         ----------
-        image_path : str
-            The path to the image to use for the prompt.
+        image_path : ImageInput
+            The path to the image to use for the prompt, or the image itself as a BGR array or PIL image.
 
         Returns
         -------
         list[ResponseComponent]
             A list of ResponseComponent objects containing relevant data generated by the model.
         """
-        image_bytes = base64_encode_image_from_file(image_path)
+        image_bytes = self._encode_image(image_path)
         return self._prompt_model(image_bytes)
     
-    def prompt_which_part(self, part_image_path: str, component_names: list[str]) -> list[ResponseComponent]:
-        image_bytes = base64_encode_image_from_file(part_image_path)
+    def prompt_stream(self, image_path: ImageInput) -> Iterator[ResponseComponent]:
+        """
+        Prompts the OpenAI api with a streamed completion and yields each ResponseComponent as soon
+        as the model has finished generating it.
+
+        Parameters
+        ----------
+        image_path : ImageInput
+            The path to the image to use for the prompt, or the image itself as a BGR array or PIL image.
+
+        Returns
+        -------
+        Iterator[ResponseComponent]
+            The ResponseComponent objects generated by the model, in order.
+        """
+        image_bytes = self._encode_image(image_path)
+        yield from self._prompt_model_stream(image_bytes)
+
+    def prompt_which_part(self, part_image_path: ImageInput, component_names: list[str]) -> str:
+        image_bytes = self._encode_image(part_image_path)
         return self._prompt_model_for_individual_part(image_bytes, component_names)
+
+    def prompt_which_parts(self, part_images: list[ImageInput], component_names: list[str]) -> list[str]:
+        """
+        Identifies several parts in a single multi-image request.
+
+        Parameters
+        ----------
+        part_images : list[ImageInput]
+            The images of the parts that were disposed of.
+        component_names : list[str]
+            The names of the components the parts can be.
+
+        Returns
+        -------
+        list[str]
+            The name of the component in each image, in the order of the images.
+        """
+        if not part_images:
+            return []
+        if len(part_images) == 1:
+            return [self.prompt_which_part(part_images[0], component_names)]
+        images_bytes = [self._encode_image(image) for image in part_images]
+        return self._prompt_model_for_multiple_parts(images_bytes, component_names)
@@ -0,0 +1,52 @@
+from utils.configuration import get_classifier_config
+from .classifier import Classifier
+from .client import OpenAIClient
+from .local_classifier import LocalClassifier
+from .result_cache import CachedClassifier, ResultCache
+
+
+def create_classifier(config: dict = None) -> Classifier:
+    """
+    Creates the classifier backend selected by the "BACKEND" key of the configuration.
+
+    Parameters
+    ----------
+    config : dict
+        The classifier configuration. Loaded from classifier_config.json when None.
+
+    Returns
+    -------
+    Classifier
+        An OpenAIClient for the "openai" backend, or a LocalClassifier for the "local" backend,
+        wrapped in a CachedClassifier when "CACHE_ENABLED" is set.
+    """
+    if config is None:
+        config = get_classifier_config()
+
+    backend = config.get("BACKEND", "openai")
+
+    def openai_client():
+        return OpenAIClient(municipality=config.get("MUNICIPALITY", "Montreal"),
+                            model=config.get("OPENAI_MODEL", "gpt-4o"),
+                            upload_max_edge=config.get("UPLOAD_MAX_EDGE", 1024),
+                            upload_quality=config.get("UPLOAD_JPEG_QUALITY", 85),
+                            structured_output=config.get("STRUCTURED_OUTPUT", True),
+                            max_parse_retries=config.get("MAX_PARSE_RETRIES", 1),
+                            base_url=config.get("OPENAI_BASE_URL"))
+
+    if backend == "openai":
+        classifier = openai_client()
+    elif backend == "local":
+        fallback = openai_client() if config.get("LOCAL_FALLBACK_TO_OPENAI", False) else None
+        classifier = LocalClassifier(config["LOCAL_MODEL_PATH"], config["LOCAL_LABELS_PATH"],
+                                     min_confidence=config.get("LOCAL_MIN_CONFIDENCE", 0.6), fallback=fallback)
+    else:
+        raise ValueError(f"Unknown classifier backend: {backend}")
+
+    if config.get("CACHE_ENABLED", False):
+        cache = ResultCache(path=config.get("CACHE_PATH", "cache/recognition_cache.json"),
+                            max_distance=config.get("CACHE_MAX_DISTANCE", 1),
+                            max_entries=config.get("CACHE_MAX_ENTRIES", 512),
+                            ttl=config.get("CACHE_TTL_SECONDS", 7 * 24 * 3600))
+        classifier = CachedClassifier(classifier, cache, region=config.get("CACHE_HASH_REGION"))
+    return classifier
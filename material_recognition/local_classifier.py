@@ -0,0 +1,176 @@
+import os
+
+import cv2
+import numpy as np
+
+from utils.custom_logger import get_logger
+from utils.json_reader import read_json
+from .classifier import Classifier
+from .prompt_output import ResponseComponent
+from .utils import load_image, ImageInput
+
+logger = get_logger(__name__)
+
+
+class NumpyModel:
+    """
+    Reference model running entirely in NumPy: a single linear layer followed by a softmax.
+    Loaded from a .npz file containing a "weights" (features x classes) and a "bias" (classes) array.
+    Mostly useful for tests and as a fallback when no inference runtime is installed.
+    """
+
+    def __init__(self, model_path: str):
+        data = np.load(model_path)
+        self.weights = data["weights"].astype(np.float32)
+        self.bias = data["bias"].astype(np.float32)
+
+    def __call__(self, batch: np.ndarray) -> np.ndarray:
+        return batch.reshape(len(batch), -1) @ self.weights + self.bias
+
+
+class OnnxModel:
+    """
+    Runs an ONNX model on the CPU with onnxruntime.
+    """
+
+    def __init__(self, model_path: str):
+        import onnxruntime
+
+        self.session = onnxruntime.InferenceSession(model_path, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def __call__(self, batch: np.ndarray) -> np.ndarray:
+        return self.session.run(None, {self.input_name: batch})[0]
+
+
+class TFLiteModel:
+    """
+    Runs a TFLite model on the CPU with tflite_runtime, or TensorFlow Lite if it is not installed.
+    """
+
+    def __init__(self, model_path: str):
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            from tensorflow.lite import Interpreter
+
+        self.interpreter = Interpreter(model_path=model_path)
+        self.interpreter.allocate_tensors()
+        self.input_index = self.interpreter.get_input_details()[0]["index"]
+        self.output_index = self.interpreter.get_output_details()[0]["index"]
+
+    def __call__(self, batch: np.ndarray) -> np.ndarray:
+        self.interpreter.set_tensor(self.input_index, batch)
+        self.interpreter.invoke()
+        return self.interpreter.get_tensor(self.output_index)
+
+
+MODEL_LOADERS = {
+    ".npz": NumpyModel,
+    ".onnx": OnnxModel,
+    ".tflite": TFLiteModel,
+}
+
+
+class LocalClassifier(Classifier):
+    """
+    Classifies items on the CPU with a small on-device image classification model.
+
+    The labels file is a JSON object describing the model's classes:
+    {
+        "input_size": [224, 224],
+        "layout": "NCHW",
+        "labels": ["coffee_cup", ...],
+        "components": {
+            "coffee_cup": [
+                {"component": "Cup", "description": "...", "material": "Paper", "disposable_category": "Compost"},
+                {"component": "Lid", "description": "...", "material": "Plastic", "recycling_number": "6", "disposable_category": "Garbage"}
+            ]
+        }
+    }
+    Labels found in "components" describe whole items and are used by prompt. The other labels
+    describe single parts and are matched against the component names by prompt_which_part.
+
+    Predictions below min_confidence are handed to the fallback classifier when one is given.
+    """
+
+    def __init__(self, model_path: str, labels_path: str, min_confidence: float = 0.6, fallback: Classifier = None):
+        """
+        Parameters
+        ----------
+        model_path : str
+            Path to the .onnx, .tflite or .npz model.
+        labels_path : str
+            Path to the JSON file describing the model's classes.
+        min_confidence : float
+            Minimum softmax probability for a prediction to be trusted.
+        fallback : Classifier
+            Classifier used when the local model is not confident enough.
+        """
+        extension = os.path.splitext(model_path)[1].lower()
+        if extension not in MODEL_LOADERS:
+            raise ValueError(f"Unsupported model format: {extension}")
+
+        labels = read_json(labels_path)
+        if labels is None:
+            raise RuntimeError(f"Labels not available: {labels_path}")
+
+        self.model = MODEL_LOADERS[extension](model_path)
+        self.labels = labels["labels"]
+        self.components = labels.get("components", {})
+        self.input_size = tuple(labels.get("input_size", (224, 224)))
+        self.layout = labels.get("layout", "NCHW")
+        self.min_confidence = min_confidence
+        self.fallback = fallback
+        logger.info(f"Local classifier loaded from {model_path} with {len(self.labels)} classes")
+
+    def _preprocess(self, image_path: ImageInput) -> np.ndarray:
+        """
+        Loads the image and turns it into a normalised float32 batch of one.
+        """
+        image = load_image(image_path)
+        if image.ndim == 2:
+            image = cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+        image = cv2.resize(image, self.input_size, interpolation=cv2.INTER_AREA)
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB).astype(np.float32) / 255.0
+        if self.layout == "NCHW":
+            image = image.transpose(2, 0, 1)
+        return image[np.newaxis]
+
+    def _predict(self, image_path: ImageInput) -> np.ndarray:
+        """
+        Returns the probability of every class for the image.
+        """
+        logits = np.asarray(self.model(self._preprocess(image_path)), dtype=np.float32)[0]
+        exp = np.exp(logits - logits.max())
+        return exp / exp.sum()
+
+    def prompt(self, image_path: ImageInput) -> list[ResponseComponent]:
+        probabilities = self._predict(image_path)
+        # Only whole items can describe the components of the item
+        candidates = [i for i, label in enumerate(self.labels) if label in self.components]
+        if candidates:
+            best = max(candidates, key=lambda i: probabilities[i])
+            confidence = probabilities[best]
+            label = self.labels[best]
+            if confidence >= self.min_confidence:
+                logger.info(f"Local classifier recognised {label} ({confidence:.2f})")
+                return [ResponseComponent(component) for component in self.components[label]]
+            logger.info(f"Local classifier not confident enough: {label} ({confidence:.2f})")
+
+        if self.fallback:
+            return self.fallback.prompt(image_path)
+        return []
+
+    def prompt_which_part(self, part_image_path: ImageInput, component_names: list[str]) -> str:
+        probabilities = self._predict(part_image_path)
+        names = {name.lower() for name in component_names}
+        candidates = [i for i, label in enumerate(self.labels) if label.lower() in names]
+        if candidates:
+            best = max(candidates, key=lambda i: probabilities[i])
+            if probabilities[best] >= self.min_confidence:
+                return self.labels[best]
+
+        if self.fallback:
+            return self.fallback.prompt_which_part(part_image_path, component_names)
+        return "Unidentified"
@@ -0,0 +1,78 @@
+import time
+
+from .classifier import Classifier
+from .utils import ImageInput
+
+
+class PartBatcher:
+    """
+    Collects the crops of parts dropped in the bins over a short window, so they are
+    identified together in a single multi-image request instead of one round trip each.
+
+    The window opens with the first crop added. Once it has elapsed, ready returns True
+    and flush identifies every collected crop at once.
+    """
+
+    def __init__(self, classifier: Classifier, window: float = 0.5, max_batch_size: int = 6):
+        """
+        Parameters
+        ----------
+        classifier : Classifier
+            The classifier used to identify the parts.
+        window : float
+            Time (in seconds) to wait for more parts after the first one.
+        max_batch_size : int
+            Number of parts after which the batch is ready without waiting for the window.
+        """
+        self.classifier = classifier
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self._crops = []
+        self._regions = []
+        self._opened_at = None
+
+    def add(self, part_image: ImageInput, region_index: int):
+        """
+        Adds the crop of a part dropped in a region.
+        """
+        if self._opened_at is None:
+            self._opened_at = time.monotonic()
+        self._crops.append(part_image)
+        self._regions.append(region_index)
+
+    def __len__(self) -> int:
+        return len(self._crops)
+
+    def ready(self) -> bool:
+        """
+        Returns True once the window has elapsed or the batch is full.
+        """
+        if self._opened_at is None:
+            return False
+        return len(self._crops) >= self.max_batch_size or time.monotonic() - self._opened_at >= self.window
+
+    def flush(self, component_names: list[str]) -> list[tuple[int, str]]:
+        """
+        Identifies every collected part in a single request and empties the batch.
+
+        Parameters
+        ----------
+        component_names : list[str]
+            The names of the components the parts can be.
+
+        Returns
+        -------
+        list[tuple[int, str]]
+            (region index, component name) for each part, in the order they were added.
+        """
+        crops, regions = self._crops, self._regions
+        self.clear()
+        if not crops:
+            return []
+        names = self.classifier.prompt_which_parts(crops, component_names)
+        return list(zip(regions, names))
+
+    def clear(self):
+        self._crops = []
+        self._regions = []
+        self._opened_at = None
@@ -1,6 +1,39 @@
 import json
 
 
+DISPOSABLE_CATEGORIES = ("Recycling", "Garbage", "Compost", "Edge case")
+
+# JSON schema enforced on the model output in structured output mode
+RESPONSE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "components": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "component": {"type": "string"},
+                    "description": {"type": "string"},
+                    "material": {"type": "string"},
+                    "recycling_number": {"type": ["string", "null"]},
+                    "disposable_category": {"type": "string", "enum": list(DISPOSABLE_CATEGORIES)},
+                },
+                "required": ["component", "description", "material", "recycling_number", "disposable_category"],
+                "additionalProperties": False,
+            },
+        },
+    },
+    "required": ["components"],
+    "additionalProperties": False,
+}
+
+
+class ResponseParseError(ValueError):
+    """
+    Raised when the model output cannot be parsed into valid components.
+    """
+
+
 class ResponseComponent:
     """
     Object representing the components returned by the OpenAI API text.
@@ -10,8 +43,12 @@ class ResponseComponent:
     - material
     - recycling_number
     - disposable_category
+
+    A component missing one of the required fields has every field set to None.
     """
 
+    __slots__ = ("component_name", "material", "recycling_number", "disposable_category")
+
     component_name: str
     material: str
     recycling_number: str
@@ -19,23 +56,150 @@ class ResponseComponent:
 
     def __init__(self, component: dict) -> None:
         try:
-            self.component_name = component['component']
+            # Some answers use "component_name" instead of "component"
+            self.component_name = component['component'] if 'component' in component else component['component_name']
             self.material = component['material']
-            try:
-                self.recycling_number = component['recycling_number']
-            except KeyError:
-                self.recycling_number = None
-            self.disposable_category = component['disposable_category']
-        except KeyError:
+            self.recycling_number = component.get('recycling_number')
+            self.disposable_category = _normalise_category(component['disposable_category'])
+            if not all(isinstance(field, str) and field for field in (self.component_name, self.material, self.disposable_category)):
+                raise KeyError
+        except (KeyError, TypeError, AttributeError):
             self.component_name = None
             self.material = None
             self.recycling_number = None
             self.disposable_category = None
 
+    @property
+    def is_valid(self) -> bool:
+        return self.component_name is not None
+
+    def to_dict(self) -> dict:
+        """
+        Returns the component in the same format as the API output, so it can be stored and parsed again.
+        """
+        return {
+            "component": self.component_name,
+            "material": self.material,
+            "recycling_number": self.recycling_number,
+            "disposable_category": self.disposable_category,
+        }
+
     def __repr__(self):
-        return f"{self.component_name}, {self.disposable_category}, {self.material} {f'#{self.recycling_number}' if hasattr(self, 'recycling_number') else ''}"
+        return f"{self.component_name}, {self.disposable_category}, {self.material} {f'#{self.recycling_number}' if self.recycling_number else ''}"
+
+def _normalise_category(category):
+    """
+    Matches the category case-insensitively against the known categories, e.g. "recycling" -> "Recycling".
+    """
+    if not isinstance(category, str):
+        return category
+    for known in DISPOSABLE_CATEGORIES:
+        if category.strip().lower() == known.lower():
+            return known
+    return category.strip()
+
+class ResponseStreamParser:
+    """
+    Incrementally parses a JSON array of components as the completion is streamed.
+
+    feed is called with each chunk of text and returns the ResponseComponent of every
+    object that closed in that chunk, so the first component can be used while the
+    next ones are still being generated. Text outside the top-level array, such as
+    ```json fences or the {"components": [...]} wrapper of structured output, is ignored.
+
+    finish is called once the stream has ended, to check that the array was complete.
+    """
+
+    def __init__(self) -> None:
+        self.failures = 0
+        self.complete = False
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._object = []
+
+    def feed(self, chunk: str) -> list[ResponseComponent]:
+        """
+        Parses the next chunk of text and returns the valid components that closed in it.
+        Invalid components are dropped and counted in failures.
+        """
+        components = []
+        for char in chunk:
+            if self._depth >= 2:
+                self._object.append(char)
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"' and self._depth > 0:
+                self._in_string = True
+            elif char in "[{":
+                if char == "{" and self._depth == 1:
+                    self._object = [char]
+                if self._depth > 0 or char == "[":
+                    self._depth += 1
+            elif char in "]}" and self._depth > 0:
+                self._depth -= 1
+                if char == "]" and self._depth == 0:
+                    self.complete = True
+                if char == "}" and self._depth == 1:
+                    component = self._close_object()
+                    if component.is_valid:
+                        components.append(component)
+        return components
+
+    def finish(self) -> bool:
+        """
+        Checks the whole output once the stream has ended. A missing or truncated array counts as a failure.
+        :return: True if the output was a complete array of valid components.
+        """
+        if not self.complete:
+            self.failures += 1
+        return self.failures == 0
 
-def parse_api_response(chatgpt_response_message: str) -> list[ResponseComponent]:
+    def _close_object(self) -> ResponseComponent:
+        text = "".join(self._object)
+        self._object = []
+        try:
+            component = ResponseComponent(json.loads(text))
+        except json.JSONDecodeError:
+            component = ResponseComponent({})
+        if not component.is_valid:
+            self.failures += 1
+        return component
+
+def parse_part_names(chatgpt_response_message: str, count: int) -> list[str]:
+    """
+        Parses the answer to a multi-image part identification prompt.
+
+        Parameters
+        ----------
+        chatgpt_response_message : str
+            A JSON list of component names, one per image. Ex: ["Cup", "Lid", "Unidentified"]
+        count : int
+            The number of images that were sent.
+
+        Returns
+        -------
+        list[str]
+            Exactly `count` component names. Missing or unreadable answers become "Unidentified".
+        """
+    try:
+        names = json.loads(chatgpt_response_message)
+        if not isinstance(names, list):
+            names = [names]
+    except json.JSONDecodeError:
+        # Fall back to one answer per line
+        names = [line.strip(' "\',-') for line in chatgpt_response_message.splitlines() if line.strip(' "\',-[]')]
+
+    names = [str(name) for name in names[:count]]
+    return names + ["Unidentified"] * (count - len(names))
+
+def parse_api_response(chatgpt_response_message: str, strict: bool = True) -> list[ResponseComponent]:
     """
         Takes the output of a chatgpt message and parses it.
 
@@ -63,7 +227,49 @@ def parse_api_response(chatgpt_response_message: str) -> list[ResponseComponent]
                         "disposable_category": "Garbage"
                     }
                 ]
+            ``` fences, prose around the array and the {"components": [...]} wrapper of
+            structured output are tolerated.
+        strict : bool
+            Whether a component missing a required field fails the whole response.
+            Invalid components are dropped otherwise.
+
+        Returns
+        -------
+        list[ResponseComponent]
+            The valid components of the response.
+
+        Raises
+        ------
+        ResponseParseError
+            If the response is not a JSON list of components, or a component is invalid in strict mode.
         """
 
-    json_list = json.loads(chatgpt_response_message)
-    return [ResponseComponent(obj) for obj in json_list]
+    text = chatgpt_response_message.strip()
+    # Strip ``` or ```json fences the model sometimes adds
+    if text.startswith("```"):
+        text = text.split("\n", 1)[1] if "\n" in text else text[3:]
+        text = text.rsplit("```", 1)[0]
+
+    try:
+        parsed = json.loads(text)
+    except json.JSONDecodeError:
+        # Fall back to the outermost array, ignoring any prose around it
+        start, end = text.find("["), text.rfind("]")
+        if start == -1 or end <= start:
+            raise ResponseParseError(f"No JSON array in response: {chatgpt_response_message[:100]!r}")
+        try:
+            parsed = json.loads(text[start:end + 1])
+        except json.JSONDecodeError as e:
+            raise ResponseParseError(f"Invalid JSON in response: {e}") from e
+
+    # Structured output wraps the list in {"components": [...]}
+    if isinstance(parsed, dict):
+        parsed = parsed.get("components", [parsed])
+    if not isinstance(parsed, list):
+        raise ResponseParseError(f"Unexpected response type: {type(parsed).__name__}")
+
+    components = [ResponseComponent(obj) for obj in parsed if isinstance(obj, dict)]
+    valid_components = [component for component in components if component.is_valid]
+    if strict and len(valid_components) != len(parsed):
+        raise ResponseParseError(f"{len(parsed) - len(valid_components)} of {len(parsed)} components are invalid")
+    return valid_components
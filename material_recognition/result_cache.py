@@ -0,0 +1,223 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterator
+
+import cv2
+import numpy as np
+
+from utils.custom_logger import get_logger
+from .classifier import Classifier
+from .prompt_output import ResponseComponent
+from .utils import load_image, ImageInput
+
+logger = get_logger(__name__)
+
+
+def perceptual_hash(image_path: ImageInput, crop: list[list[int]] = None) -> int:
+    """
+    Computes a 64 bit difference hash (dHash) of an image.
+    Similar looking images have hashes with a small Hamming distance.
+
+    Parameters
+    ----------
+    image_path : ImageInput
+        The path to the image to hash, or the image itself as a BGR array or PIL image.
+    crop : list[list[int]]
+        Region to hash, as [[x_start, x_end], [y_start, y_end]]. The whole image is hashed when None.
+
+    Returns
+    -------
+    int
+        The 64 bit hash of the image.
+    """
+    image = load_image(image_path)
+    if crop is not None:
+        (x0, x1), (y0, y1) = crop
+        image = image[y0:y1, x0:x1]
+    if image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(image, (9, 8), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+class ResultCache:
+    """
+    Cache of recognition results keyed by the perceptual hash of the image.
+
+    A lookup matches the closest stored hash within max_distance bits. Entries are
+    evicted when they are older than ttl seconds, or least recently used first when
+    the cache holds more than max_entries. The cache is persisted to a JSON file.
+    """
+
+    def __init__(self, path: str = "cache/recognition_cache.json", max_distance: int = 1,
+                 max_entries: int = 512, ttl: float = 7 * 24 * 3600):
+        """
+        Parameters
+        ----------
+        path : str
+            The JSON file the cache is persisted to. Nothing is persisted when None.
+        max_distance : int
+            Maximum Hamming distance between two hashes for them to match.
+        max_entries : int
+            Maximum number of entries kept.
+        ttl : float
+            Time (in seconds) after which an entry expires.
+        """
+        self.path = path
+        self.max_distance = max_distance
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r") as cache_file:
+                for entry in json.load(cache_file):
+                    self._entries[entry["hash"]] = (entry["created"], entry["components"])
+            self._evict()
+            logger.info(f"Loaded {len(self._entries)} cached recognition results from {self.path}")
+        except Exception as e:
+            logger.error(f"Error loading recognition cache {self.path}: {e}")
+            self._entries.clear()
+
+    def _save(self):
+        if not self.path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            entries = [{"hash": image_hash, "created": created, "components": components}
+                       for image_hash, (created, components) in self._entries.items()]
+            # Write to a temporary file first so a crash never leaves a truncated cache
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, "w") as cache_file:
+                json.dump(entries, cache_file)
+            os.replace(temp_path, self.path)
+        except Exception as e:
+            logger.error(f"Error saving recognition cache {self.path}: {e}")
+
+    def _evict(self):
+        now = time.time()
+        for image_hash in [h for h, (created, _) in self._entries.items() if now - created > self.ttl]:
+            del self._entries[image_hash]
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, image_hash: int) -> list[ResponseComponent]:
+        """
+        Returns the cached result of the closest matching image, or None on a miss.
+        """
+        with self._lock:
+            self._evict()
+            best_hash, best_distance = None, self.max_distance + 1
+            for cached_hash in self._entries:
+                distance = (cached_hash ^ image_hash).bit_count()
+                if distance < best_distance:
+                    best_hash, best_distance = cached_hash, distance
+
+            if best_hash is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._entries.move_to_end(best_hash)
+            _, components = self._entries[best_hash]
+        logger.debug(f"Recognition cache hit at distance {best_distance}")
+        return [ResponseComponent(component) for component in components]
+
+    def put(self, image_hash: int, response_components: list[ResponseComponent]):
+        """
+        Stores a result and persists the cache.
+        """
+        with self._lock:
+            self._entries[image_hash] = (time.time(), [c.to_dict() for c in response_components])
+            self._entries.move_to_end(image_hash)
+            self._evict()
+            self._save()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._save()
+
+    def stats(self) -> dict:
+        """
+        Returns the hit and miss counters, to tune max_distance.
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "entries": len(self._entries),
+            }
+
+
+class CachedClassifier(Classifier):
+    """
+    Wraps a classifier and reuses its results for images that look like one seen before.
+
+    Only the region where items are presented should be hashed: the camera is fixed, so
+    in a hash of the whole frame the background dominates and different items held in
+    the same spot match each other.
+    """
+
+    def __init__(self, classifier: Classifier, cache: ResultCache, region: list[list[int]] = None):
+        """
+        Parameters
+        ----------
+        classifier : Classifier
+            The classifier whose results are cached.
+        cache : ResultCache
+            The cache storing the results.
+        region : list[list[int]]
+            Region where items are presented, as [[x_start, x_end], [y_start, y_end]] in
+            pixels of the classified images. The whole image is hashed when None.
+        """
+        self.classifier = classifier
+        self.cache = cache
+        self.region = region
+        if region is None:
+            logger.warning("Recognition cache hashes whole frames: set a region so only the item is hashed.")
+
+    def prompt(self, image_path: ImageInput) -> list[ResponseComponent]:
+        image_hash = perceptual_hash(image_path, self.region)
+        cached = self.cache.get(image_hash)
+        if cached is not None:
+            return cached
+
+        response_components = self.classifier.prompt(image_path)
+        # Only cache results that were fully understood
+        if response_components and all(c.component_name is not None for c in response_components):
+            self.cache.put(image_hash, response_components)
+        return response_components
+
+    def prompt_stream(self, image_path: ImageInput) -> Iterator[ResponseComponent]:
+        image_hash = perceptual_hash(image_path, self.region)
+        cached = self.cache.get(image_hash)
+        if cached is not None:
+            yield from cached
+            return
+
+        response_components = []
+        for component in self.classifier.prompt_stream(image_path):
+            response_components.append(component)
+            yield component
+        if response_components and all(c.component_name is not None for c in response_components):
+            self.cache.put(image_hash, response_components)
+
+    def prompt_which_part(self, part_image_path: ImageInput, component_names: list[str]) -> str:
+        return self.classifier.prompt_which_part(part_image_path, component_names)
+
+    def prompt_which_parts(self, part_images: list[ImageInput], component_names: list[str]) -> list[str]:
+        return self.classifier.prompt_which_parts(part_images, component_names)
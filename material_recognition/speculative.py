@@ -0,0 +1,121 @@
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from utils.custom_logger import get_logger
+from .prompt_output import ResponseComponent
+from .result_cache import perceptual_hash
+from .utils import ImageInput
+
+logger = get_logger(__name__)
+
+
+class SpeculativeClassifier:
+    """
+    Starts recognising an item as soon as it is presented, before it has settled.
+
+    start sends the first frame right away. refine is called with the settled frame:
+    if it looks materially different from the frame being recognised (perceptual
+    hash distance above max_distance), the speculative request is cancelled and
+    replaced by one on the settled frame. Otherwise the speculative result is kept,
+    and the user only waits for whatever is left of the round trip.
+
+    Like the result cache, only the region where items are presented should be
+    hashed: with a fixed camera, the background dominates a hash of the whole frame,
+    and an empty scene, a blurry frame or a hand covering the item all look alike.
+
+    Works with synchronous classifiers, run on a thread pool, and with asynchronous
+    ones such as AsyncOpenAIClient, run on a private event loop. A synchronous call
+    that already started cannot be interrupted, so its result is discarded instead.
+    """
+
+    def __init__(self, classifier, max_distance: int = 1, region: list[list[int]] = None):
+        """
+        Parameters
+        ----------
+        classifier : Classifier or AsyncOpenAIClient
+            The classifier used to recognise items.
+        max_distance : int
+            Maximum perceptual hash distance for the settled frame to be considered the same as the speculative one.
+        region : list[list[int]]
+            Region where items are presented, as [[x_start, x_end], [y_start, y_end]] in
+            pixels of the frames. The whole frame is hashed when None.
+        """
+        self.classifier = classifier
+        self.max_distance = max_distance
+        self.region = region
+        if region is None:
+            logger.warning("Speculative recognition hashes whole frames: set a region so only the item is compared.")
+        self._is_async = asyncio.iscoroutinefunction(classifier.prompt)
+        self._future = None
+        self._hash = None
+        self._lock = threading.Lock()
+
+        if self._is_async:
+            self._loop = asyncio.new_event_loop()
+            threading.Thread(target=self._loop.run_forever, daemon=True).start()
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="speculative")
+
+    def _submit(self, image: ImageInput) -> Future:
+        if self._is_async:
+            return asyncio.run_coroutine_threadsafe(self.classifier.prompt(image), self._loop)
+        return self._executor.submit(self.classifier.prompt, image)
+
+    def start(self, image: ImageInput):
+        """
+        Starts recognising the item from the first frame it was seen in.
+        Any previous request is cancelled.
+        """
+        image_hash = perceptual_hash(image, self.region)
+        with self._lock:
+            self._cancel()
+            self._hash = image_hash
+            self._future = self._submit(image)
+        logger.info("Speculative recognition started.")
+
+    def refine(self, image: ImageInput) -> bool:
+        """
+        Replaces the speculative request if the settled frame differs materially.
+
+        Returns
+        -------
+        bool
+            True if the request was replaced, False if the speculative request was kept.
+        """
+        image_hash = perceptual_hash(image, self.region)
+        with self._lock:
+            if self._future is not None and self._hash is not None:
+                distance = (image_hash ^ self._hash).bit_count()
+                if distance <= self.max_distance and not self._future.cancelled():
+                    logger.info(f"Settled frame matches the speculative frame (distance {distance}).")
+                    return False
+                logger.info(f"Settled frame differs from the speculative frame (distance {distance}), restarting.")
+
+            self._cancel()
+            self._hash = image_hash
+            self._future = self._submit(image)
+            return True
+
+    def result(self, timeout: float = None) -> list[ResponseComponent]:
+        """
+        Waits for the current request and returns its result.
+        """
+        with self._lock:
+            future = self._future
+        if future is None:
+            raise RuntimeError("No recognition in progress.")
+        return future.result(timeout)
+
+    def cancel(self):
+        """
+        Cancels the current request, e.g. when the item is pulled away.
+        """
+        with self._lock:
+            self._cancel()
+
+    def _cancel(self):
+        if self._future is not None:
+            self._future.cancel()
+        self._future = None
+        self._hash = None
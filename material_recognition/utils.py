@@ -1,6 +1,109 @@
+import os
 from base64 import b64encode
+from dataclasses import dataclass
+from typing import Union
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from utils.custom_logger import get_logger
+
+logger = get_logger(__name__)
+
+# An image given as a file path, a BGR array (OpenCV / Picamera2 RGB888) or a PIL image
+ImageInput = Union[str, np.ndarray, Image.Image]
+
+
+@dataclass
+class PreprocessedImage:
+    """
+    A JPEG image ready to be uploaded.
+
+    Contains the following fields:
+    - data: the JPEG encoded bytes
+    - original_bytes: size of the source file, or of the raw pixels for in-memory images
+    - encoded_bytes: size of the JPEG encoded bytes
+    """
+
+    data: bytes
+    original_bytes: int
+    encoded_bytes: int
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.original_bytes - self.encoded_bytes
 
 
 def base64_encode_image_from_file(image_path: str) -> bytes:
     with open(image_path, "rb") as image_file:
         return b64encode(image_file.read()).decode('utf-8')
+
+
+def load_image(image: ImageInput) -> np.ndarray:
+    """
+    Returns the image as a BGR (or grayscale) array, reading it from disk if needed.
+    """
+    if isinstance(image, np.ndarray):
+        return image
+    if isinstance(image, Image.Image):
+        return cv2.cvtColor(np.asarray(image.convert("RGB")), cv2.COLOR_RGB2BGR)
+
+    array = cv2.imread(image)
+    if array is None:
+        raise FileNotFoundError(f"Could not read image: {image}")
+    return array
+
+
+def preprocess_image(image: ImageInput, max_edge: int = 1024, quality: int = 85,
+                     crop: list[list[int]] = None) -> PreprocessedImage:
+    """
+    Crops, downscales and re-encodes an image before it is uploaded.
+
+    Parameters
+    ----------
+    image : ImageInput
+        The path to the image, or the image itself as a BGR array or PIL image.
+    max_edge : int
+        Maximum length (in pixels) of the longest edge. The image is never upscaled.
+    quality : int
+        JPEG quality, between 0 and 100.
+    crop : list[list[int]]
+        Region to keep, as [[x_start, x_end], [y_start, y_end]]. The whole image is kept when None.
+
+    Returns
+    -------
+    PreprocessedImage
+        The JPEG encoded image and the number of bytes saved.
+    """
+    array = load_image(image)
+    if isinstance(image, str):
+        original_bytes = os.path.getsize(image)
+    else:
+        original_bytes = array.nbytes
+
+    if crop is not None:
+        (x0, x1), (y0, y1) = crop
+        array = array[y0:y1, x0:x1]
+
+    height, width = array.shape[:2]
+    scale = max_edge / max(height, width)
+    if scale < 1:
+        array = cv2.resize(array, (round(width * scale), round(height * scale)), interpolation=cv2.INTER_AREA)
+
+    success, encoded = cv2.imencode(".jpg", array, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    if not success:
+        raise ValueError("Could not encode image as JPEG.")
+    data = encoded.tobytes()
+    return PreprocessedImage(data, original_bytes, len(data))
+
+
+def base64_encode_image(image: ImageInput, max_edge: int = 1024, quality: int = 85,
+                        crop: list[list[int]] = None) -> str:
+    """
+    Preprocesses an image with preprocess_image and returns it base64 encoded.
+    """
+    preprocessed = preprocess_image(image, max_edge, quality, crop)
+    logger.debug(f"Upload image preprocessed: {preprocessed.original_bytes} -> {preprocessed.encoded_bytes} bytes "
+                 f"({preprocessed.bytes_saved} saved)")
+    return b64encode(preprocessed.data).decode('utf-8')
@@ -5,6 +5,10 @@ import os
 import time 
 from time import sleep
 import PIL
+from utils.custom_logger import get_logger
+
+# Initialize the logger
+logger = get_logger(__name__)
 
 def motion_detection(image_filepath: str, previous_image_filepath: str, mask_dim: list[list, list] =  [[[0, 500], [0, 500]]], take_image_funct = lambda: None) -> int:
     """
@@ -49,6 +53,195 @@ def motion_detection(image_filepath: str, previous_image_filepath: str, mask_dim
             return i, "masked_item.jpg"
     return -1, None
 
+class MotionDetector:
+    """
+    Scores motion in several rectangular regions of a frame in a single pass.
+
+    Regions use the same [[x_start, x_end], [y_start, y_end]] format as MASK and are
+    expressed in reference (full resolution) pixel coordinates. They are scaled
+    automatically to whatever frame size is given, so the same regions work for a
+    full resolution still and for a downscaled motion frame.
+
+    The bounding box of all regions is downscaled to the analysis resolution and
+    converted to grayscale once per frame. The absolute difference with the
+    previous frame is thresholded once and turned into an integral image, so the
+    number of moving pixels in every region is read with four lookups, whatever
+    the number of regions.
+
+    Instead of only comparing with the previous frame, each frame is compared with
+    a running-average background that is updated incrementally, so slow lighting
+    changes and flicker are absorbed while objects dropped in a bin still stand
+    out. A learning rate of 1.0 makes the background the previous frame, which is
+    the plain frame-pair difference.
+    """
+
+    def __init__(self, regions: list[list[list[int]]], scale: float = 1.0, reference_size: tuple[int, int] = None,
+                 pixel_threshold: int = 40, motion_threshold: float = 0.02, learning_rate: float = 0.05):
+        """
+        :param regions: List of [[x_start, x_end], [y_start, y_end]] boxes, one per bin.
+        :param scale: Resolution used for motion analysis, relative to the reference size (e.g. 0.25 or 0.125).
+        :param reference_size: (width, height) the regions are expressed in. Defaults to the size of the first frame.
+        :param pixel_threshold: Minimum grayscale difference for a pixel to count as moving.
+        :param motion_threshold: Fraction of moving pixels needed for a region to report motion.
+        :param learning_rate: Weight of each new frame in the background model, between 0 and 1.
+        """
+        self.regions = regions
+        self.scale = scale
+        self.reference_size = reference_size
+        self.pixel_threshold = pixel_threshold
+        self.motion_threshold = motion_threshold
+        self.learning_rate = learning_rate
+        self._boxes = np.array([[x[0], x[1], y[0], y[1]] for x, y in regions], dtype=np.float64)
+        self._background = None
+        self._stale_regions = set()
+        self._shape = None
+
+    def reset(self, region_index: int = None):
+        """
+        Resets the background model. The next frame becomes the new background.
+        :param region_index: Only reset the background of this region. Resets every region when None.
+        """
+        if region_index is None:
+            self._background = None
+            self._stale_regions.clear()
+        else:
+            self._stale_regions.add(region_index)
+
+    def _to_gray(self, frame: np.ndarray) -> np.ndarray:
+        if frame.ndim == 2:
+            return frame
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+    def _boxes_for(self, shape: tuple) -> np.ndarray:
+        """
+        Returns the regions scaled and clipped to a frame of the given shape.
+        """
+        height, width = shape[:2]
+        if self.reference_size is None:
+            self.reference_size = (width, height)
+        factors = np.array([width / self.reference_size[0]] * 2 + [height / self.reference_size[1]] * 2)
+        boxes = np.rint(self._boxes * factors).astype(np.int64)
+        boxes[:, 0:2] = np.clip(boxes[:, 0:2], 0, width)
+        boxes[:, 2:4] = np.clip(boxes[:, 2:4], 0, height)
+        return boxes
+
+    def _prepare(self, shape: tuple):
+        """
+        Computes the bounding box of all regions in the input frame and the region
+        boxes at analysis resolution.
+        """
+        self._shape = shape
+        self._background = None
+        boxes = self._boxes_for(shape)
+        x0, y0 = boxes[:, 0].min(), boxes[:, 2].min()
+        x1, y1 = boxes[:, 1].max(), boxes[:, 3].max()
+        self._bounds = (x0, x1, y0, y1)
+
+        # Never upscale: a frame that is already small enough is analysed as is
+        input_factor = shape[1] / self.reference_size[0]
+        self._resize_factor = min(1.0, self.scale / input_factor)
+        self._analysis_size = (max(1, round((x1 - x0) * self._resize_factor)),
+                               max(1, round((y1 - y0) * self._resize_factor)))
+
+        # Box coordinates relative to the bounding box, at analysis resolution
+        local_boxes = (boxes - np.array([x0, x0, y0, y0])) * self._resize_factor
+        local_boxes = np.rint(local_boxes).astype(np.int64)
+        local_boxes[:, 0:2] = np.clip(local_boxes[:, 0:2], 0, self._analysis_size[0])
+        local_boxes[:, 2:4] = np.clip(local_boxes[:, 2:4], 0, self._analysis_size[1])
+        self._local_boxes = local_boxes
+        self._areas = np.maximum(
+            (local_boxes[:, 1] - local_boxes[:, 0]) * (local_boxes[:, 3] - local_boxes[:, 2]), 1)
+
+    def _analysis_frame(self, frame: np.ndarray) -> np.ndarray:
+        """
+        Crops the frame to the regions, downscales it and converts it to grayscale.
+        """
+        x0, x1, y0, y1 = self._bounds
+        roi = frame[y0:y1, x0:x1]
+        if self._resize_factor < 1.0:
+            roi = cv2.resize(roi, self._analysis_size, interpolation=cv2.INTER_AREA)
+        return self._to_gray(roi)
+
+    def region_views(self, frame: np.ndarray) -> list[np.ndarray]:
+        """
+        Returns each region of the frame as a zero-copy slice, at the frame's own resolution.
+        """
+        return [frame[y0:y1, x0:x1] for x0, x1, y0, y1 in self._boxes_for(frame.shape)]
+
+    def crop(self, frame: np.ndarray, region_index: int) -> np.ndarray:
+        """
+        Returns a single region of the frame as a zero-copy slice, at the frame's own resolution.
+        Pass the full resolution frame to get the crop that is sent for classification.
+        """
+        return self.region_views(frame)[region_index]
+
+    def score(self, frame: np.ndarray) -> np.ndarray:
+        """
+        Compares the frame with the background model, updates the model and returns the
+        motion ratio of every region. The first frame after a reset only seeds the
+        background and scores zero in the regions that were reset.
+        :param frame: BGR or grayscale frame, at any resolution.
+        :return: Array with one motion ratio per region, in the order of the regions.
+        """
+        if frame.shape != self._shape:
+            self._prepare(frame.shape)
+
+        gray = self._analysis_frame(frame)
+        if self._background is None:
+            self._background = gray.astype(np.float32)
+            self._stale_regions.clear()
+            return np.zeros(len(self._boxes))
+
+        # Re-seed the regions that were reset individually
+        for index in self._stale_regions:
+            x0, x1, y0, y1 = self._local_boxes[index]
+            self._background[y0:y1, x0:x1] = gray[y0:y1, x0:x1]
+
+        frame_diff = cv2.absdiff(gray, cv2.convertScaleAbs(self._background))
+        _, moving = cv2.threshold(frame_diff, self.pixel_threshold, 1, cv2.THRESH_BINARY)
+        cv2.accumulateWeighted(gray, self._background, self.learning_rate)
+
+        integral = cv2.integral(moving)
+        bx0, bx1, by0, by1 = self._local_boxes.T
+        counts = integral[by1, bx1] - integral[by0, bx1] - integral[by1, bx0] + integral[by0, bx0]
+        ratios = counts / self._areas
+
+        if self._stale_regions:
+            ratios[list(self._stale_regions)] = 0
+            self._stale_regions.clear()
+        return ratios
+
+    def detect(self, frame: np.ndarray) -> int:
+        """
+        Returns the index of the region with the most motion above the threshold.
+        Returns -1 if no motion was detected.
+        """
+        ratios = self.score(frame)
+        index = int(np.argmax(ratios))
+        if ratios[index] < self.motion_threshold:
+            return -1
+        logger.debug(f"Movement in region {index} (motion ratio {ratios[index]:.3f})")
+        return index
+
+    def detect_all(self, frame: np.ndarray) -> list[int]:
+        """
+        Returns the indices of every region with motion above the threshold, e.g. when
+        several items are dropped in different bins at the same time.
+        """
+        ratios = self.score(frame)
+        indices = [int(i) for i in np.flatnonzero(ratios >= self.motion_threshold)]
+        if indices:
+            logger.debug(f"Movement in regions {indices}")
+        return indices
+
+    def save_region(self, frame: np.ndarray, region_index: int, filepath: str = "masked_item.jpg") -> str:
+        """
+        Writes a region of the frame to disk so it can be sent for classification.
+        :return: The path of the written image.
+        """
+        cv2.imwrite(filepath, self.crop(frame, region_index))
+        return filepath
+
 def masking(image, mask : list[list, list]):
 
     zeros_mask = np.zeros(image.shape[:2], np.uint8)
@@ -1,35 +1,84 @@
+import threading
 import time
 import numpy as np
 from datetime import datetime
-from hardware.cameras.imx500_camera import IMX500Camera
-from hardware.motion_sensor.ultrasonic_motion_sensor import UltrasonicSensor
+from hardware.cameras.frame_buffer import Frame
+from hardware.factory import create_camera, create_distance_sensor
+from hardware.motion_sensor.presence_sampler import PresenceSampler, PresenceEvent
+from utils.configuration import get_hardware_config
 from utils.custom_logger import get_logger
 
 # Initialize logger
 logger = get_logger(__name__)
 
+# Time (in seconds) to wait before capturing again when the capture of a present object failed
+CAPTURE_RETRY_DELAY = 0.1
+
 
 class ObjectTracker:
-    def __init__(self, detection_distance=10):
+    def __init__(self, detection_distance=10, buffer_size=8, settle_frames=5):
         """
-        Initializes the object tracking module with an ultrasonic sensor and a camera.
+        Initializes the object tracking module with a distance sensor and a camera,
+        real or simulated depending on the hardware configuration.
         :param detection_distance: Distance (in cm) to detect an object.
+        :param buffer_size: Number of frames kept by the camera's background capture thread.
+        :param settle_frames: Number of new frames to wait for when picking the sharpest frame of an object.
         """
-        self.camera = IMX500Camera()
-        self.sensor = UltrasonicSensor(
-            trigger_distance=detection_distance, callback=self._on_object_detected)
+        self.camera = create_camera()
+        self.camera.start_streaming(buffer_size)
+        self.settle_frames = settle_frames
+        self._last_frame_timestamp = None
+        self.sensor = create_distance_sensor(trigger_distance=detection_distance)
         self.image_ready = False
         self.image_path = None
+        self._on_presence = None
+        self.detected_at = None
+        self.present = False
+        self._entered = threading.Event()
+        self._entered_distance = None
+
+        # The sensor is sampled in the background, and only presence changes are reported
+        hardware_config = get_hardware_config()
+        self.sampler = PresenceSampler(
+            self.sensor, enter_distance=detection_distance,
+            hysteresis=hardware_config.get("PRESENCE_HYSTERESIS", 4),
+            window=hardware_config.get("PRESENCE_FILTER_WINDOW", 5),
+            ema_alpha=hardware_config.get("PRESENCE_EMA_ALPHA", 0.5),
+            idle_interval=hardware_config.get("PRESENCE_IDLE_INTERVAL", 0.3),
+            active_interval=hardware_config.get("PRESENCE_ACTIVE_INTERVAL", 0.05),
+            approach_distance=hardware_config.get("PRESENCE_APPROACH_DISTANCE", 40))
+        self.sampler.subscribe(self._on_presence_event)
+        self.sampler.start()
+
+    def _on_presence_event(self, event, distance):
+        """
+        Called from the sampler thread when an object enters or leaves the detection distance.
+        """
+        self.present = event == PresenceEvent.ENTERED
+        if self.present:
+            self.detected_at = time.monotonic()
+            self._entered_distance = distance
+            self._entered.set()
 
     def _on_object_detected(self, distance):
         """
         Internal callback triggered when an object is detected.
         Captures an image and marks it as ready for processing.
         """
-        logger.info(f"Object detected at {distance} cm. Preparing to capture an image...")
-        # Give time for the object to be properly placed
-        time.sleep(1)
+        logger.info(f"Object detected at {distance:.1f} cm. Preparing to capture an image...")
+        if self._on_presence:
+            # Hand over a full resolution frame right away, before the object has settled
+            frame = self.camera.capture_main_frame()
+            if frame is not None:
+                self._on_presence(frame)
+
+        return self._capture_object()
 
+    def _capture_object(self):
+        """
+        Captures an image of the detected object and marks it as ready for processing.
+        :return: True if the image was captured.
+        """
         self.image_path = self._capture_image()
         if self.image_path:
             # Indicate the image is ready for processing
@@ -39,12 +88,13 @@ class ObjectTracker:
 
     def _capture_image(self):
         """
-        Captures an image using the IMX500 camera and returns the file path.
+        Saves a full resolution frame of the settled object and returns the file path.
         :return: Path to the captured image.
         """
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"scanned_object_{timestamp}.jpg"
-        image_path = self.camera.capture_image(filename)
+        frame = self.capture_settled_frame()
+        image_path = self.camera.save_frame(frame.main, filename) if frame else None
 
         if image_path:
             logger.info(f"Image successfully captured: {image_path}")
@@ -58,6 +108,44 @@ class ObjectTracker:
         image = self.camera.capture_image_no_file()
         return image
 
+    def capture_frame(self, timeout: float = 1.0) -> Frame:
+        """
+        Returns the next buffered lores frame, newer than the one returned by the previous call.
+        Waits on the frame buffer, not on the sensor. The main image of the frame is not captured.
+        :param timeout: Maximum time (in seconds) to wait for a new frame.
+        :return: The next Frame, or None on timeout.
+        """
+        frame = self.camera.wait_for_frame(self._last_frame_timestamp, timeout)
+        if frame is None:
+            logger.error("Failed to capture frame.")
+            return None
+        self._last_frame_timestamp = frame.timestamp
+        return frame
+
+    def capture_settled_frame(self, timeout: float = 1.0) -> Frame:
+        """
+        Waits for `settle_frames` new lores frames, and for up to `settle_frames` more until the newest
+        one is the sharpest of the recent ones, then captures a full resolution frame. This avoids
+        classifying a frame blurred by the object still moving, while only capturing one main frame.
+        :param timeout: Maximum time (in seconds) to wait for each new frame.
+        :return: A Frame whose main image is set, or None on failure.
+        """
+        latest = self.camera.latest_frame()
+        after = latest.timestamp if latest else None
+        for waited in range(2 * self.settle_frames):
+            latest = self.camera.wait_for_frame(after, timeout)
+            if latest is None:
+                break
+            after = latest.timestamp
+            if waited + 1 >= self.settle_frames and \
+                    latest.sharpness >= self.camera.sharpest_frame(self.settle_frames).sharpness:
+                break
+
+        frame = self.camera.capture_main_frame()
+        if frame is None:
+            logger.error("Failed to capture settled frame.")
+        return frame
+
     def process_latest_image(self):
         """
         Runs object recognition on the most recently captured image.
@@ -67,31 +155,42 @@ class ObjectTracker:
         logger.info(f"Detected object: {detected_object}")
         return detected_object
 
-    def scan_for_new_object(self):
+    def scan_for_new_object(self, on_presence=None):
         """
-        Continuously waits for an object, captures an image, and returns the image path.
-        Only resumes scanning after the previous image is fully processed.
+        Waits for an object to be presented, captures an image, and returns the image path.
+        An object still in front of the sensor after the previous scan must be pulled away and presented again.
+        :param on_presence: Function called with the latest Frame as soon as an object is detected,
+                            before waiting for it to settle.
         """
         logger.info("Scanning for an object...")
+        self._on_presence = on_presence
 
         while True:
             self.image_ready = False
             self.image_path = None
 
-            # Block execution until an object is detected and captured
-            self.sensor.start_monitoring()
-
-            # Wait until the image is marked as ready
-            while not self.image_ready:
-                time.sleep(0.1)  # Prevent CPU overuse
-
-            logger.info(f"Image ready for processing: {self.image_path}")
-            return self.image_path  # Return the image path for further processing
+            # Block execution until the sampler reports an object. An object presented
+            # while the previous one was being tracked is picked up right away.
+            self._entered.wait()
+            self._entered.clear()
+            if not self.present:
+                continue  # Pulled away before it could be scanned
+
+            captured = self._on_object_detected(self._entered_distance)
+            # The object is not reported again while it stays, so retry the capture instead of waiting for it
+            while not captured and self.present:
+                time.sleep(CAPTURE_RETRY_DELAY)
+                logger.info("Object still present. Retrying the capture...")
+                captured = self._capture_object()
+            if captured:
+                logger.info(f"Image ready for processing: {self.image_path}")
+                return self.image_path  # Return the image path for further processing
 
     def cleanup(self):
         """
         Releases resources used by the camera and sensor.
         """
+        self.sampler.stop()
         self.camera.cleanup()
         self.sensor.cleanup()
         logger.info("ObjectTracker resources released.")
@@ -0,0 +1,220 @@
+from time import time
+
+from utils.custom_logger import get_logger
+from utils.latency import LatencyRecorder
+from text_to_speech.comment_genrator import get_comment, get_looking_cue, component_to_text, ResultType, \
+    INSTRUCTIONS_INTRO, INSTRUCTIONS_OUTRO
+from text_to_speech.speech_manager import Priority
+
+# Initialize the logger
+logger = get_logger(__name__)
+
+SCANNING = 0
+TRACKING = 1
+
+MASK_TO_REGION_MAPPING = {
+    0: "Compost",
+    1: "Recycling",
+    2: "Garbage"
+}
+
+# Bin regions as [[x_start, x_end], [y_start, y_end]], in full resolution (2028x1520) pixels
+MASK = [[[1350, 1900], [780, 1450]], [
+    [650, 1265], [753, 1440]], [[0, 577], [753, 1450]]]
+
+
+def is_relevant_component(component):
+    """
+    Ignore components that were not understood, and the box or cardboard the item may be presented in.
+    """
+    return component.is_valid and (
+        component.component_name.lower() != "box" and component.material.lower() != "cardboard")
+
+
+class RecyclingStation:
+    """
+    The scanning / tracking state machine of a recycling station.
+
+    In the SCANNING state the station waits for an item, recognises its components and
+    tells the user where each one goes. It then switches to TRACKING, watches the bins
+    for the parts being dropped, and tells the user whether each part went in the right bin.
+
+    The hardware and the classifier are passed in, so the same state machine runs on
+    the Pi and in benchmarks. Each stage is timed in the latency recorder:
+    - recognition_first_component: trigger to first component recognised
+    - trigger_to_first_instruction: trigger to the first component being handed to speech
+    - recognition_total: trigger to the last component recognised
+    - motion_frame: motion analysis of one tracking frame
+    - part_identification: identification of a batch of dropped parts
+    - presence_callback: work done when an item is presented, before its settled frame is captured
+    """
+
+    def __init__(self, tracker, client, face_display, tts_manager, motion_detector, part_batcher,
+                 speculative_client=None, tracking_timeout: float = 45, latency: LatencyRecorder = None):
+        """
+        :param tracker: ObjectTracker providing the scanned images and the tracking frames.
+        :param client: Classifier used to recognise items.
+        :param face_display: FaceDisplay showing the station's mood.
+        :param tts_manager: TextToSpeechManager speaking the instructions in the background. speak must only
+                            queue the text, as it is called on the presence path.
+        :param motion_detector: MotionDetector watching the bin regions.
+        :param part_batcher: PartBatcher identifying the dropped parts.
+        :param speculative_client: SpeculativeClassifier, to start recognition as soon as an item is presented.
+        :param tracking_timeout: Time (in seconds) spent tracking before scanning again.
+        :param latency: LatencyRecorder timing each stage.
+        """
+        self.tracker = tracker
+        self.client = client
+        self.face_display = face_display
+        self.tts_manager = tts_manager
+        self.motion_detector = motion_detector
+        self.part_batcher = part_batcher
+        self.speculative_client = speculative_client
+        self.tracking_timeout = tracking_timeout
+        self.latency = latency or LatencyRecorder()
+
+        self.state = SCANNING
+        self.items = []
+        self.items_to_bin_mapping = {}
+        self.active_regions = set()
+        self.tracking_start_time = None
+
+    def _on_presence(self, frame):
+        # Runs before the settled frame is captured: everything here must return right
+        # away, so the cue is only queued and the recognition only submitted
+        with self.latency.measure("presence_callback"):
+            # Start recognising right away and tell the user we are on it
+            self.speculative_client.start(frame.main)
+            self.tts_manager.interrupt()
+            self.tts_manager.speak(get_looking_cue(), Priority.CHATTER)
+
+    def scan(self):
+        """
+        Waits for an item, then recognises it and tells the user where to put each component.
+        """
+        # Make face neutral
+        self.face_display.display_neutral_face()
+
+        # Scan for a new object
+        image_path = self.tracker.scan_for_new_object(
+            on_presence=self._on_presence if self.speculative_client else None)
+        if not image_path:
+            return
+
+        logger.info(f"Captured image: {image_path}")
+        triggered_at = getattr(self.tracker, "detected_at", None) or self.latency.now()
+        if not self.speculative_client:
+            # Whatever is left to say about the previous item is stale
+            self.tts_manager.interrupt()
+
+        # Process the captured image
+        if self.speculative_client:
+            # Keep the speculative result unless the settled image differs materially
+            self.speculative_client.refine(image_path)
+            components = self.speculative_client.result()
+        else:
+            # Components are yielded as soon as the model has generated them
+            components = self.client.prompt_stream(image_path)
+
+        # Tell the user what the object is and where to put it, one component at a time
+        self.tts_manager.speak(INSTRUCTIONS_INTRO)
+        response_objects = []
+        for index, component in enumerate(components):
+            if index == 0:
+                self.latency.record_since("recognition_first_component", triggered_at)
+            if not is_relevant_component(component):
+                continue
+            if not response_objects:
+                self.latency.record_since("trigger_to_first_instruction", triggered_at)
+            response_objects.append(component)
+            self.tts_manager.speak(component_to_text(component))
+        self.latency.record_since("recognition_total", triggered_at)
+        self.tts_manager.speak(INSTRUCTIONS_OUTRO)
+
+        self.items_to_bin_mapping = {obj.component_name.lower(
+        ): obj.disposable_category for obj in response_objects}
+
+        self.state = TRACKING
+        self.tracking_start_time = time()
+
+        # Items to be detected
+        self.items = []
+        for component in response_objects:
+            if component.component_name.lower() not in self.items:
+                self.items.append(component.component_name.lower())
+
+    def track(self):
+        """
+        Processes one tracking frame, and reports the parts dropped in the bins.
+        """
+        # Waiting for the next buffered frame paces the loop at the camera frame rate
+        frame = self.tracker.capture_frame()
+        with self.latency.measure("motion_frame"):
+            moving_regions = self.motion_detector.detect_all(frame.lores) if frame is not None else []
+        new_regions = [i for i in moving_regions if i not in self.active_regions]
+        self.active_regions = set(moving_regions)
+
+        if new_regions:
+            logger.info(f"Motion detected in {', '.join(MASK_TO_REGION_MAPPING[i] for i in new_regions)}")
+
+            # Crop the items from a full resolution frame captured once they have settled
+            settled_frame = self.tracker.capture_settled_frame()
+            if settled_frame is not None:
+                for region_idx in new_regions:
+                    self.part_batcher.add(self.motion_detector.crop(settled_frame.main, region_idx), region_idx)
+
+        # Prompt openai to see what items were placed in the bins
+        identified_parts = []
+        if self.part_batcher.ready():
+            with self.latency.measure("part_identification"):
+                identified_parts = self.part_batcher.flush(self.items)
+
+        for mask_idx, component_name in identified_parts:
+            # Check that the object was put in the right place
+            result = ResultType.CORRECT if component_name.lower(
+            ) in self.items_to_bin_mapping and self.items_to_bin_mapping[component_name.lower()] == MASK_TO_REGION_MAPPING[mask_idx] else ResultType.INCORRECT
+
+            # Corrections are spoken before any pending praise
+            priority = Priority.CORRECTION if result == ResultType.INCORRECT else Priority.INSTRUCTION
+            self.tts_manager.speak(
+                f"Detected {component_name} placed in {MASK_TO_REGION_MAPPING[mask_idx]}", priority)
+
+            # Display the face
+            self.face_display.display_happy_face(
+            ) if result == ResultType.CORRECT else self.face_display.display_angry_face()
+
+            # Generate a comment based on the result
+            comment = get_comment(result)
+
+            # Turn comment to speech, without waiting for it to be spoken
+            for sentence in comment:
+                self.tts_manager.speak(sentence, priority if result == ResultType.INCORRECT else Priority.CHATTER)
+
+        # Find better way of going back to previous state
+        if time() - self.tracking_start_time > self.tracking_timeout:
+            self.stop_tracking()
+
+    def stop_tracking(self):
+        """
+        Goes back to scanning for a new item.
+        """
+        self.state = SCANNING
+        self.motion_detector.reset()
+        self.part_batcher.clear()
+        self.active_regions = set()
+
+    def step(self):
+        """
+        Runs one iteration of the state machine.
+        """
+        if self.state == SCANNING:
+            self.scan()
+        elif self.state == TRACKING:
+            self.track()
+
+    def run(self, should_stop=lambda: False):
+        """
+        Runs the state machine until should_stop returns True.
+        """
+        while not should_stop():
+            self.step()
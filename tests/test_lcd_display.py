@@ -0,0 +1,33 @@
+import time
+
+from hardware.displays.LCD_16x2_display import LCDDisplay
+from hardware.displays.memory_lcd import MemoryCharLCD
+
+
+def test_timed_message_sent_first_expires():
+    lcd = MemoryCharLCD()
+    display = LCDDisplay(lcd=lcd)
+    try:
+        display.display_timed_message("Hello", duration=0.1)
+        display.wait()
+        assert lcd.lines()[0].startswith("Hello")
+
+        time.sleep(0.3)
+        assert lcd.lines() == [" " * 16] * 2
+    finally:
+        display.close()
+
+
+def test_timed_message_restores_previous_message():
+    lcd = MemoryCharLCD()
+    display = LCDDisplay(lcd=lcd)
+    try:
+        display.display_message("Idle")
+        display.display_timed_message("Hello", duration=0.1)
+        display.wait()
+        assert lcd.lines()[0].startswith("Hello")
+
+        time.sleep(0.3)
+        assert lcd.lines()[0] == "Idle".ljust(16)
+    finally:
+        display.close()
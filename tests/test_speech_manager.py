@@ -0,0 +1,58 @@
+import threading
+
+from text_to_speech.speech_manager import TextToSpeechManager
+
+
+class BlockingTextToSpeech:
+    """
+    TextToSpeech whose synthesis blocks until released, recording the texts played.
+    """
+
+    def __init__(self):
+        self.synthesizing = threading.Event()
+        self.release = threading.Event()
+        self.played = []
+        self.discarded = []
+
+    def synthesize(self, text):
+        self.synthesizing.set()
+        self.release.wait(5)
+        return f"{text}.mp3"
+
+    def play(self, audio_path):
+        self.played.append(audio_path)
+        return True
+
+    def discard(self, audio_path):
+        self.discarded.append(audio_path)
+
+    def stop(self):
+        pass
+
+
+def test_interrupt_during_synthesis_does_not_play():
+    tts = BlockingTextToSpeech()
+    manager = TextToSpeechManager(tts=tts, lookahead=1, synthesis_workers=1)
+    try:
+        future = manager.speak("Hello")
+        assert tts.synthesizing.wait(5)
+
+        manager.interrupt()
+        tts.release.set()
+
+        assert future.result(5) is False
+        assert tts.played == []
+        assert tts.discarded == ["Hello.mp3"]
+    finally:
+        manager.shutdown()
+
+
+def test_speaks_queued_text():
+    tts = BlockingTextToSpeech()
+    tts.release.set()
+    manager = TextToSpeechManager(tts=tts, lookahead=1, synthesis_workers=1)
+    try:
+        assert manager.speak("Hello").result(5) is True
+        assert tts.played == ["Hello.mp3"]
+    finally:
+        manager.shutdown()
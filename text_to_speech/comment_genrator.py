@@ -25,6 +25,52 @@ def get_comment(result_type: ResultType):
     responses = read_json("text_to_speech/responses.json")
     return random.choice(responses[result_type.value])
 
+def get_looking_cue():
+    """
+    Get a random short phrase to play while an item is being recognised.
+    :return: A random cue as a string.
+    """
+    responses = read_json("text_to_speech/responses.json")
+    return random.choice(responses["looking"])
+
+INSTRUCTIONS_INTRO = "It looks like you have "
+INSTRUCTIONS_OUTRO = "If that is not what you have, please pull it away and present it again."
+UNDERSTANDING_ISSUE = "There was an issue understanding this item. Please try again."
+
+def get_static_phrases():
+    """
+    Get every phrase that does not depend on the item, so it can be synthesized ahead of time.
+    :return: A list of phrases, without duplicates.
+    """
+    responses = read_json("text_to_speech/responses.json")
+    phrases = [INSTRUCTIONS_INTRO, INSTRUCTIONS_OUTRO, UNDERSTANDING_ISSUE]
+    phrases.extend(responses["looking"])
+    for result_type in ResultType:
+        for comment in responses[result_type.value]:
+            phrases.extend(comment)
+    return list(dict.fromkeys(phrases))
+
+def component_to_text(obj):
+    """
+    Converts a single OpenAI response object into a user-friendly spoken instruction.
+
+    :param obj: A ResponseComponent object.
+    :return: The formatted instructional string.
+    """
+    # Validate that all expected attributes exist
+    if not hasattr(obj, "component_name") or not hasattr(obj, "material") or not hasattr(obj, "disposable_category"):
+        logger.error("Response object is missing expected attributes.")
+        return UNDERSTANDING_ISSUE
+
+    # Extract values, handling None cases
+    component_name = obj.component_name if obj.component_name else "an unknown object"
+    material = obj.material if obj.material else "an unknown material"
+    recycling_number = f" with recycling number {obj.recycling_number}" if obj.recycling_number else ""
+    disposable_category = obj.disposable_category if obj.disposable_category else "an unknown category"
+
+    # Construct message
+    return f"A{'n' if component_name[0] in {'a', 'e', 'i', 'o', 'u'} else ''} {component_name}, made of {material}{recycling_number}. Please put it in {disposable_category}."
+
 def turn_response_to_text(response_objects):
     """
     Converts OpenAI response objects into user-friendly spoken instructions.
@@ -33,24 +79,10 @@ def turn_response_to_text(response_objects):
     :return: List of formatted instructional strings.
     """
     instructions = []
-    instructions.append("It looks like you have ")
+    instructions.append(INSTRUCTIONS_INTRO)
     for obj in response_objects:
-        # Validate that all expected attributes exist
-        if not hasattr(obj, "component_name") or not hasattr(obj, "material") or not hasattr(obj, "disposable_category"):
-            logger.error("Response object is missing expected attributes.")
-            instructions.append("There was an issue understanding this item. Please try again.")
-            continue  # Skip this object and move to the next
-
-        # Extract values, handling None cases
-        component_name = obj.component_name if obj.component_name else "an unknown object"
-        material = obj.material if obj.material else "an unknown material"
-        recycling_number = f" with recycling number {obj.recycling_number}" if obj.recycling_number else ""
-        disposable_category = obj.disposable_category if obj.disposable_category else "an unknown category"
-
-        # Construct message
-        message = f"A{'n' if component_name[0] in {'a', 'e', 'i', 'o', 'u'} else ''} {component_name}, made of {material}{recycling_number}. Please put it in {disposable_category}."
-        instructions.append(message)
-    instructions.append("If that is not what you have, please pull it away and present it again.")
+        instructions.append(component_to_text(obj))
+    instructions.append(INSTRUCTIONS_OUTRO)
 
     return instructions
 
@@ -0,0 +1,22 @@
+"""
+Synthesizes every static phrase into the speech cache, so they play instantly and offline:
+
+    python -m text_to_speech.prewarm
+"""
+from text_to_speech.comment_genrator import get_static_phrases
+from text_to_speech.tts import create_text_to_speech
+from utils.custom_logger import get_logger
+
+# Initialize the logger
+logger = get_logger(__name__)
+
+
+def main():
+    tts = create_text_to_speech()
+    phrases = get_static_phrases()
+    synthesized = tts.prewarm(phrases)
+    logger.info(f"{synthesized} of {len(phrases)} static phrases synthesized, the others were already cached.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from utils.custom_logger import get_logger
+
+# Initialize the logger
+logger = get_logger(__name__)
+
+
+class SpeechCache:
+    """
+    Content-addressed disk cache of synthesized speech.
+
+    Each audio file is named after the hash of the (text, lang, voice) it was synthesized
+    from, so a phrase is only synthesized once and keeps playing when the network is down.
+    The least recently used files are deleted when the cache grows over max_bytes. Files
+    are touched when used, so the order survives restarts.
+    """
+
+    def __init__(self, directory="cache/speech", max_bytes=50 * 1024 * 1024, extension=".mp3"):
+        """
+        :param directory: Directory the audio files are stored in.
+        :param max_bytes: Maximum total size (in bytes) of the audio files.
+        :param extension: Extension of the audio files.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.extension = extension
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> size, least recently used first
+        self._size = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    @staticmethod
+    def key(text, lang, voice=""):
+        """
+        Returns the content address of a phrase.
+        """
+        return hashlib.sha256(json.dumps([text, lang, voice]).encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + self.extension)
+
+    def _load(self):
+        files = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(self.extension):
+                continue
+            stat = os.stat(os.path.join(self.directory, name))
+            files.append((stat.st_mtime, name[:-len(self.extension)], stat.st_size))
+        for _, key, size in sorted(files):
+            self._entries[key] = size
+            self._size += size
+        self._evict()
+        logger.info(f"Loaded {len(self._entries)} cached phrases ({self._size} bytes) from {self.directory}")
+
+    def _evict(self):
+        while self._size > self.max_bytes and len(self._entries) > 1:
+            key, size = self._entries.popitem(last=False)
+            self._size -= size
+            try:
+                os.remove(self._path(key))
+            except OSError as e:
+                logger.error(f"Error removing cached phrase {key}: {e}")
+
+    def get(self, text, lang, voice=""):
+        """
+        Returns the path to the cached audio of a phrase, or None on a miss.
+        """
+        key = self.key(text, lang, voice)
+        path = self._path(key)
+        with self._lock:
+            if key not in self._entries or not os.path.exists(path):
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return path
+
+    def __contains__(self, phrase):
+        text, lang, voice = phrase
+        with self._lock:
+            return self.key(text, lang, voice) in self._entries
+
+    def put(self, text, lang, voice, audio):
+        """
+        Stores the audio of a phrase and returns its path.
+        :param audio: The encoded audio bytes.
+        """
+        key = self.key(text, lang, voice)
+        path = self._path(key)
+        # Write to a temporary file first so a crash never leaves a truncated file
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as audio_file:
+            audio_file.write(audio)
+        os.replace(temp_path, path)
+
+        with self._lock:
+            self._size -= self._entries.pop(key, 0)
+            self._entries[key] = len(audio)
+            self._size += len(audio)
+            self._evict()
+        return path
+
+    def clear(self):
+        with self._lock:
+            for key in self._entries:
+                try:
+                    os.remove(self._path(key))
+                except OSError:
+                    pass
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self):
+        """
+        Returns the hit and miss counters and the size of the cache.
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._size,
+            }
@@ -1,37 +1,221 @@
+import heapq
+import itertools
 import threading
-import queue
-from text_to_speech.tts import TextToSpeech
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from enum import IntEnum
+from text_to_speech.comment_genrator import get_static_phrases
+from text_to_speech.tts import TextToSpeech, create_text_to_speech
+from utils.configuration import get_tts_config
+from utils.custom_logger import get_logger
+
+# Initialize the logger
+logger = get_logger(__name__)
+
+
+class Priority(IntEnum):
+    """
+    Priority of an utterance. Lower values are spoken first, equal values in the order they were queued.
+    """
+    CORRECTION = 0
+    INSTRUCTION = 1
+    CHATTER = 2
+
+
+@dataclass(order=True)
+class Utterance:
+    """
+    A queued piece of text.
+
+    Contains the following fields:
+    - priority: the Priority of the text
+    - sequence: the order the text was queued in, among texts of the same priority
+    - text: the text to speak
+    - future: resolved with True once spoken, False if it could not be spoken or was interrupted, cancelled when flushed
+    - audio: the synthesis of the text started ahead of time, resolved with the audio file path
+    - interrupted: set by interrupt, so the text is not played once its synthesis is over
+    """
+
+    priority: int
+    sequence: int
+    text: str = field(compare=False)
+    future: Future = field(compare=False, default_factory=Future)
+    audio: Future = field(compare=False, default=None)
+    interrupted: bool = field(compare=False, default=False)
+
 
 class TextToSpeechManager:
     """
     Manages text-to-speech in a background thread to prevent overlapping speech.
+
+    speak only queues the text and returns immediately, so the caller keeps running while
+    the text is synthesized and played. The queue is ordered by priority, and the queued
+    texts can be flushed, e.g. when a new item is presented and the feedback about the
+    previous one is stale.
+
+    While a text plays, the next `lookahead` queued texts are synthesized on a pool of
+    workers, so consecutive texts play back to back instead of waiting for synthesis.
     """
-    def __init__(self):
-        self.tts = TextToSpeech()
-        self.speech_queue = queue.Queue()
+    def __init__(self, tts: TextToSpeech = None, lookahead: int = None, synthesis_workers: int = None):
+        """
+        :param tts: TextToSpeech used to speak. Created from tts_config.json when None.
+        :param lookahead: Number of queued texts synthesized ahead of time. Read from tts_config.json when None.
+        :param synthesis_workers: Number of texts synthesized at the same time. Read from tts_config.json when None.
+        """
+        tts_config = get_tts_config()
+        if tts is None:
+            tts = create_text_to_speech(tts_config)
+            if tts_config.get("PREWARM_ON_STARTUP", False):
+                # Synthesize the static phrases in the background, so startup is not delayed
+                threading.Thread(target=tts.prewarm, args=(get_static_phrases(),), daemon=True).start()
+        self.tts = tts
+        self.lookahead = tts_config.get("LOOKAHEAD_DEPTH", 2) if lookahead is None else lookahead
+        workers = tts_config.get("SYNTHESIS_WORKERS", 2) if synthesis_workers is None else synthesis_workers
+        self._executor = ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix="synthesis")
+        self._queue = []
+        self._sequence = itertools.count()
+        self._current = None
+        self._running = True
+        self._condition = threading.Condition()
         self.speaking_thread = threading.Thread(target=self._speech_worker, daemon=True)
         self.speaking_thread.start()
 
     def _speech_worker(self):
         """
-        Continuously runs in the background to process speech requests one at a time.
+        Continuously runs in the background to process speech requests one at a time, highest priority first.
         """
         while True:
-            text = self.speech_queue.get()  # Get next text from queue
-            if text is None:  
-                break  # Exit the thread if None is received (cleanup)
-            self.tts.speak(text)  # Speak text
-            self.speech_queue.task_done()  # Mark task as complete
+            with self._condition:
+                self._condition.wait_for(lambda: self._queue or not self._running)
+                if not self._running:
+                    break  # Exit the thread on shutdown
+                utterance = heapq.heappop(self._queue)
+                if not utterance.future.set_running_or_notify_cancel():
+                    continue
+                self._current = utterance
+                self._synthesize_ahead(utterance)
+                # Start synthesizing the texts after this one while it plays
+                self._synthesize_ahead(*heapq.nsmallest(self.lookahead, self._queue))
+
+            try:
+                logger.info(f"Speaking text: {utterance.text}")
+                try:
+                    audio_path = utterance.audio.result()
+                except Exception as e:
+                    logger.error(f"Error during speech synthesis: {e}")
+                    spoken = False
+                else:
+                    with self._condition:
+                        interrupted = utterance.interrupted
+                    if interrupted:
+                        # Interrupted while synthesizing: stopping the speaker had no effect
+                        logger.debug(f"Interrupted before playing: {utterance.text}")
+                        self.tts.discard(audio_path)
+                        spoken = False
+                    else:
+                        spoken = self.tts.play(audio_path)
+                utterance.future.set_result(spoken is not False)
+            except Exception as e:
+                logger.error(f"Error speaking '{utterance.text}': {e}")
+                utterance.future.set_exception(e)
+            finally:
+                with self._condition:
+                    self._current = None
+                    self._condition.notify_all()
+
+    def _synthesize_ahead(self, *utterances):
+        """
+        Starts synthesizing the utterances that are not being synthesized yet. Called with the condition held.
+        """
+        for utterance in utterances:
+            if utterance.audio is None:
+                utterance.audio = self._executor.submit(self.tts.synthesize, utterance.text)
+
+    def _discard_audio(self, utterance):
+        """
+        Cancels the synthesis of a flushed utterance, or discards its audio once synthesized.
+        """
+        if utterance.audio is None or utterance.audio.cancel():
+            return
+
+        def discard(audio):
+            if audio.exception() is None:
+                self.tts.discard(audio.result())
+        utterance.audio.add_done_callback(discard)
+
+    def speak(self, text, priority: Priority = Priority.INSTRUCTION) -> Future:
+        """
+        Adds text to the speech queue and returns immediately.
+        :param text: The text to speak.
+        :param priority: The priority of the text.
+        :return: A Future resolved once the text has been spoken.
+        """
+        utterance = Utterance(priority, next(self._sequence), text)
+        with self._condition:
+            heapq.heappush(self._queue, utterance)
+            if self._current is not None and utterance in heapq.nsmallest(self.lookahead, self._queue):
+                self._synthesize_ahead(utterance)
+            self._condition.notify_all()
+        return utterance.future
+
+    def flush(self, priority: Priority = None) -> int:
+        """
+        Removes the queued texts that have not started playing yet, and cancels their futures.
+        :param priority: Only remove the texts of this priority or a lower one. Every text is removed when None.
+        :return: The number of texts removed.
+        """
+        with self._condition:
+            kept, flushed = [], []
+            for utterance in self._queue:
+                (flushed if priority is None or utterance.priority >= priority else kept).append(utterance)
+            heapq.heapify(kept)
+            self._queue = kept
+            self._condition.notify_all()
+        for utterance in flushed:
+            utterance.future.cancel()
+            self._discard_audio(utterance)
+        if flushed:
+            logger.debug(f"Flushed {len(flushed)} queued utterances.")
+        return len(flushed)
+
+    def interrupt(self) -> int:
+        """
+        Flushes the queue and stops the text being played.
+        :return: The number of texts removed from the queue.
+        """
+        flushed = self.flush()
+        with self._condition:
+            speaking = self._current is not None
+            if speaking:
+                # The text may still be synthesizing, and would be played once done
+                self._current.interrupted = True
+        if speaking:
+            self.tts.stop()
+        return flushed
+
+    def is_speaking(self) -> bool:
+        """
+        Returns True while a text is playing or queued.
+        """
+        with self._condition:
+            return self._current is not None or bool(self._queue)
 
-    def speak(self, text):
+    def wait(self, timeout: float = None) -> bool:
         """
-        Adds text to the speech queue.
+        Waits until every queued text has been spoken.
+        :param timeout: Maximum time (in seconds) to wait.
+        :return: False if the timeout expired.
         """
-        self.tts.speak(text)
+        with self._condition:
+            return self._condition.wait_for(lambda: self._current is None and not self._queue, timeout)
 
     def shutdown(self):
         """
-        Stops the speech thread gracefully.
+        Stops the speech thread gracefully, after the text being played.
         """
-        self.speech_queue.put(None)  # Signal the thread to exit
+        self.flush()
+        with self._condition:
+            self._running = False  # Signal the thread to exit
+            self._condition.notify_all()
         self.speaking_thread.join()  # Wait for thread to finish
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -1,7 +1,10 @@
+from io import BytesIO
 from gtts import gTTS
 import tempfile
 import os
-from hardware.speakers.USB_speaker import Speaker
+from hardware.factory import create_speaker
+from text_to_speech.speech_cache import SpeechCache
+from utils.configuration import get_tts_config
 from utils.custom_logger import get_logger
 
 # Initialize the logger
@@ -9,48 +12,142 @@ logger = get_logger(__name__)
 
 
 class TextToSpeech:
-    def __init__(self, lang: str = "en", volume: float = 5.0):
+    def __init__(self, lang: str = "en", volume: float = 5.0, tld: str = "com", cache: SpeechCache = None):
         """
         Initialize the TextToSpeech object using Google TTS.
 
         :param lang: Language code for speech synthesis.
         :param volume: Speaker volume level.
+        :param tld: Google domain used for synthesis, which selects the accent (e.g. "com", "ca", "co.uk").
+        :param cache: Cache of synthesized phrases. Every phrase is synthesized again when None.
         """
+        self.lang = lang
+        self.tld = tld
+        self.cache = cache
         try:
-            self.lang = lang
-            self.speaker = Speaker()
+            self.speaker = create_speaker()
             self.speaker.set_volume(volume)
             logger.info("Google TextToSpeech initialized successfully.")
         except Exception as e:
             logger.error(f"Failed to initialize Google TTS: {e}")
 
-    def speak(self, text: str):
+    def _synthesize_bytes(self, text: str) -> bytes:
+        audio = BytesIO()
+        gTTS(text=text, lang=self.lang, tld=self.tld, slow=False).write_to_fp(audio)
+        return audio.getvalue()
+
+    def synthesize(self, text: str) -> str:
+        """
+        Returns the path to an audio file of the text, synthesizing it only if it is not cached.
+        Without a cache, the file is temporary and must be removed by the caller.
+
+        :param text: Text to synthesize.
+        """
+        if self.cache is not None:
+            audio_path = self.cache.get(text, self.lang, self.tld)
+            if audio_path:
+                logger.debug(f"Cached speech found for: {text}")
+                return audio_path
+            return self.cache.put(text, self.lang, self.tld, self._synthesize_bytes(text))
+
+        # Save the speech output to a temporary audio file
+        with tempfile.NamedTemporaryFile(suffix=".mp3", delete=False) as temp_audio_file:
+            temp_audio_file.write(self._synthesize_bytes(text))
+            logger.debug(f"TTS output saved to {temp_audio_file.name}")
+            return temp_audio_file.name
+
+    def speak(self, text: str) -> bool:
         """
         Speak the given text using Google TTS.
 
         :param text: Text to speak.
+        :return: True if the text was spoken, False on error.
         """
         try:
             logger.info(f"Speaking text: {text}")
+            audio_path = self.synthesize(text)
+        except Exception as e:
+            logger.error(f"Error during speech synthesis: {e}")
+            return False
+        return self.play(audio_path)
 
-            # Generate speech audio using Google TTS
-            tts = gTTS(text=text, lang=self.lang, slow=False)
+    def play(self, audio_path: str) -> bool:
+        """
+        Play an audio file returned by synthesize, until it is over or stopped, then discard it.
 
-            # Save the speech output to a temporary audio file
-            with tempfile.NamedTemporaryFile(suffix=".mp3", delete=False) as temp_audio_file:
-                temp_audio_path = temp_audio_file.name
-                tts.save(temp_audio_path)
-                logger.info(f"TTS output saved to {temp_audio_path}")
+        :param audio_path: Path to the audio file.
+        :return: True if the audio was played, False on error.
+        """
+        try:
+            played = self.speaker.play(audio_path)
+            if played:
+                self.speaker.wait()
+                logger.debug("TTS output played.")
+            return played
+        except Exception as e:
+            logger.error(f"Error during speech playback: {e}")
+            return False
+        finally:
+            self.discard(audio_path)
 
-            # Play the generated audio file
-            self.speaker.play(temp_audio_path)
-            logger.info("TTS output played.")
+    def discard(self, audio_path: str):
+        """
+        Remove an audio file returned by synthesize if it is temporary. Cached files are kept.
 
-            # Clean up temporary file
-            os.remove(temp_audio_path)
-            logger.info("Temporary audio file removed.")
-        except Exception as e:
-            logger.error(f"Error during speech synthesis or playback: {e}")
+        :param audio_path: Path to the audio file.
+        """
+        if self.cache is None:
+            try:
+                os.remove(audio_path)
+                logger.debug("Temporary audio file removed.")
+            except OSError as e:
+                logger.error(f"Error removing temporary audio file: {e}")
+
+    def stop(self):
+        """
+        Stops the text being played.
+        """
+        self.speaker.stop()
+
+    def prewarm(self, phrases) -> int:
+        """
+        Synthesizes the phrases that are not cached yet, so they play instantly and offline.
+
+        :param phrases: The phrases to synthesize.
+        :return: The number of phrases synthesized.
+        """
+        if self.cache is None:
+            logger.error("Speech cache disabled. Nothing to pre-warm.")
+            return 0
+
+        synthesized = 0
+        for text in phrases:
+            if (text, self.lang, self.tld) in self.cache:
+                continue
+            try:
+                self.cache.put(text, self.lang, self.tld, self._synthesize_bytes(text))
+                synthesized += 1
+            except Exception as e:
+                logger.error(f"Error pre-warming phrase '{text}': {e}")
+        logger.info(f"Speech cache pre-warmed: {synthesized} phrases synthesized.")
+        return synthesized
+
+
+def create_text_to_speech(config: dict = None) -> TextToSpeech:
+    """
+    Creates the TextToSpeech configured in tts_config.json.
+
+    :param config: The speech configuration. Loaded from tts_config.json when None.
+    """
+    if config is None:
+        config = get_tts_config()
+
+    cache = None
+    if config.get("CACHE_ENABLED", True):
+        cache = SpeechCache(directory=config.get("CACHE_PATH", "cache/speech"),
+                            max_bytes=config.get("CACHE_MAX_BYTES", 50 * 1024 * 1024))
+    return TextToSpeech(lang=config.get("LANG", "en"), volume=config.get("VOLUME", 5.0),
+                        tld=config.get("TLD", "com"), cache=cache)
 
 
 if __name__ == "__main__":
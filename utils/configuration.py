@@ -15,3 +15,27 @@ def get_hardware_config():
         logger.critical("Failed to load hardware configuration.")
         raise RuntimeError("Hardware configuration not available.")
     return hardware_config
+
+
+def get_classifier_config():
+    """
+    Lazily load and return the material recognition configuration.
+    """
+    logger.debug("Loading classifier configuration...")
+    classifier_config = read_json("material_recognition/classifier_config.json")
+    if classifier_config is None:
+        logger.critical("Failed to load classifier configuration.")
+        raise RuntimeError("Classifier configuration not available.")
+    return classifier_config
+
+
+def get_tts_config():
+    """
+    Lazily load and return the text-to-speech configuration.
+    """
+    logger.debug("Loading text-to-speech configuration...")
+    tts_config = read_json("text_to_speech/tts_config.json")
+    if tts_config is None:
+        logger.critical("Failed to load text-to-speech configuration.")
+        raise RuntimeError("Text-to-speech configuration not available.")
+    return tts_config
@@ -1,11 +1,38 @@
+import atexit
+import json
 import logging
+import logging.handlers
 import os
+import queue
+import threading
 
 # Define color codes
 RESET = "\033[0m"
 RED = "\033[31m"
 YELLOW = "\033[33m"
 
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+LOGGING_CONFIG_PATH = os.path.join(PROJECT_ROOT, "utils", "logging_config.json")
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+# Used when logging_config.json is missing or invalid
+DEFAULT_LOGGING_CONFIG = {
+    "LEVEL": "DEBUG",
+    "MODULE_LEVELS": {},
+    "CONSOLE_LEVEL": "DEBUG",
+    "FILE_LEVEL": "DEBUG",
+    "LOG_FILE": "logs/debug.log",
+    "ROTATION": "size",
+    "MAX_BYTES": 1048576,
+    "ROTATE_WHEN": "midnight",
+    "BACKUP_COUNT": 5,
+}
+
+_lock = threading.Lock()
+_queue_handler = None
+_listener = None
+_config = None
+
 
 class ColorFormatter(logging.Formatter):
     def format(self, record):
@@ -17,46 +44,113 @@ class ColorFormatter(logging.Formatter):
         return log_msg
 
 
-def get_logger(name):
+def _load_logging_config():
+    """
+    Load the logging configuration. It is read here rather than with utils.configuration,
+    which logs through this module.
     """
-    Creates and returns a logger with both stream and file handlers.
+    config = dict(DEFAULT_LOGGING_CONFIG)
+    try:
+        with open(LOGGING_CONFIG_PATH, "r") as json_file:
+            config.update(json.load(json_file))
+    except (OSError, ValueError) as e:
+        print(f"Failed to load logging configuration, using defaults: {e}")
+    return config
 
-    Args:
-        name (str): Name of the logger.
 
-    Returns:
-        logging.Logger: Configured logger instance.
+def _create_file_handler(config):
     """
-    logger = logging.getLogger(name)
-    logger.setLevel(logging.DEBUG)
+    Creates the handler writing to the log file, rotated by size or by time.
+    """
+    log_file = os.path.join(PROJECT_ROOT, config["LOG_FILE"])
+    os.makedirs(os.path.dirname(log_file), exist_ok=True)
+
+    if config["ROTATION"] == "time":
+        return logging.handlers.TimedRotatingFileHandler(
+            log_file, when=config["ROTATE_WHEN"], backupCount=config["BACKUP_COUNT"], delay=True)
+    return logging.handlers.RotatingFileHandler(
+        log_file, maxBytes=config["MAX_BYTES"], backupCount=config["BACKUP_COUNT"], delay=True)
 
-    # Ensure the logs directory exists in the project root
-    project_root = os.path.abspath(
-        os.path.join(os.path.dirname(__file__), ".."))
-    log_folder = os.path.join(project_root, "logs")
-    os.makedirs(log_folder, exist_ok=True)
+
+def _configure():
+    """
+    Sets up the handlers shared by every logger, once.
+
+    Loggers only put their records in a queue. A QueueListener thread formats them and
+    writes them to the console and the log file, so logging does not block the caller on I/O.
+    """
+    global _queue_handler, _listener, _config
+    _config = _load_logging_config()
 
     # Log debug messages to a file
-    file_handler = logging.FileHandler(os.path.join(log_folder, "debug.log"))
-    file_handler.setLevel(logging.DEBUG)
-    file_formatter = logging.Formatter(
-        "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-    )
-    file_handler.setFormatter(file_formatter)
-    logger.addHandler(file_handler)
+    file_handler = _create_file_handler(_config)
+    file_handler.setLevel(_config["FILE_LEVEL"])
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
 
     # Log colored messages to the console
     stream_handler = logging.StreamHandler()
-    stream_handler.setLevel(logging.DEBUG)
-    stream_formatter = ColorFormatter(
-        "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-    )
-    stream_handler.setFormatter(stream_formatter)
-    logger.addHandler(stream_handler)
+    stream_handler.setLevel(_config["CONSOLE_LEVEL"])
+    stream_handler.setFormatter(ColorFormatter(LOG_FORMAT))
+
+    records = queue.Queue()
+    _queue_handler = logging.handlers.QueueHandler(records)
+    _listener = logging.handlers.QueueListener(records, file_handler, stream_handler, respect_handler_level=True)
+    _listener.start()
+    # Write the queued records before the interpreter exits
+    atexit.register(shutdown_logging)
+
 
+def _level_for(name):
+    """
+    Returns the level of the most specific entry of MODULE_LEVELS matching a logger name, or LEVEL.
+    """
+    module_levels = _config["MODULE_LEVELS"]
+    parts = name.split(".")
+    for i in range(len(parts), 0, -1):
+        prefix = ".".join(parts[:i])
+        if prefix in module_levels:
+            return module_levels[prefix]
+    return _config["LEVEL"]
+
+
+def get_logger(name):
+    """
+    Returns a logger writing to the console and the rotating log file through a background thread.
+    Calling it again with the same name returns the same logger, without adding handlers.
+
+    Args:
+        name (str): Name of the logger.
+
+    Returns:
+        logging.Logger: Configured logger instance.
+    """
+    logger = logging.getLogger(name)
+    with _lock:
+        if _queue_handler is None:
+            _configure()
+        if _queue_handler not in logger.handlers:
+            logger.setLevel(_level_for(name))
+            logger.addHandler(_queue_handler)
+            # The records are written by the shared handlers only
+            logger.propagate = False
     return logger
 
 
+def shutdown_logging():
+    """
+    Writes the queued records, closes the log file and stops the background thread.
+    Records logged afterwards are not written.
+    """
+    global _listener
+    with _lock:
+        if _listener is None:
+            return
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
 # Example usage for testing purposes
 if __name__ == "__main__":
     LOGGER = get_logger(__name__)
@@ -0,0 +1,76 @@
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+
+class LatencyRecorder:
+    """
+    Records the duration of named stages and reports their percentiles.
+    Timestamps come from time.monotonic().
+    """
+
+    def __init__(self):
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def now() -> float:
+        return time.monotonic()
+
+    def record(self, stage: str, duration: float):
+        """
+        Records one duration (in seconds) for a stage.
+        """
+        with self._lock:
+            self._samples.setdefault(stage, []).append(duration)
+
+    def record_since(self, stage: str, start: float):
+        """
+        Records the time elapsed since a time.monotonic() timestamp.
+        """
+        self.record(stage, self.now() - start)
+
+    @contextmanager
+    def measure(self, stage: str):
+        """
+        Records the time spent in the with block.
+        """
+        start = self.now()
+        try:
+            yield
+        finally:
+            self.record_since(stage, start)
+
+    def samples(self, stage: str) -> list[float]:
+        with self._lock:
+            return list(self._samples.get(stage, []))
+
+    def summary(self, percentiles=(50, 90, 99)) -> dict:
+        """
+        Returns, for each stage, the number of samples, the requested percentiles and the maximum, in seconds.
+        """
+        with self._lock:
+            stages = {stage: sorted(samples) for stage, samples in self._samples.items()}
+
+        summary = {}
+        for stage, samples in stages.items():
+            stats = {"count": len(samples)}
+            for percentile in percentiles:
+                # Nearest-rank percentile
+                index = max(0, math.ceil(percentile / 100 * len(samples)) - 1)
+                stats[f"p{percentile}"] = samples[index]
+            stats["max"] = samples[-1]
+            summary[stage] = stats
+        return summary
+
+    def report(self) -> str:
+        """
+        Formats the summary as a table, in milliseconds.
+        """
+        summary = self.summary()
+        lines = [f"{'stage':<32}{'count':>7}{'p50':>10}{'p90':>10}{'p99':>10}{'max':>10}"]
+        for stage, stats in sorted(summary.items()):
+            lines.append(f"{stage:<32}{stats['count']:>7}" + "".join(
+                f"{stats[key] * 1000:>10.1f}" for key in ("p50", "p90", "p99", "max")))
+        return "\n".join(lines)